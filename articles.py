@@ -0,0 +1,192 @@
+import sys
+import weakref
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+from timeparse import parse_timestamp
+
+def _intern(value: Any) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) and value else None
+
+class Article:
+    """Immutable news article.
+
+    Built once per URL from NewsAPI JSON and shared by reference between
+    cache entries, paginators and the search index. Source names are
+    interned since a handful of outlets cover most articles, and the
+    publish time is parsed once into epoch seconds (`published_ts`).
+    """
+
+    __slots__ = ("url", "title", "description", "source", "author", "image",
+                 "published_at", "published_ts", "alternate_sources", "__weakref__")
+
+    def __init__(self, url: str, title: Optional[str] = None, description: Optional[str] = None,
+                 source: Optional[str] = None, author: Optional[str] = None, image: Optional[str] = None,
+                 published_at: Optional[str] = None,
+                 alternate_sources: Tuple[Tuple[str, str], ...] = ()):
+        set_field = object.__setattr__
+        set_field(self, "url", url)
+        set_field(self, "title", title)
+        set_field(self, "description", description)
+        source = _intern(source)
+        set_field(self, "source", source)
+        set_field(self, "author", _intern(author))
+        set_field(self, "image", image)
+        set_field(self, "published_at", published_at)
+        set_field(self, "published_ts", parse_timestamp(published_at, source))
+        set_field(self, "alternate_sources", alternate_sources)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Article is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Article is immutable")
+
+    def __repr__(self) -> str:
+        return f"Article({self.url!r})"
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Article":
+        """Build an article from NewsAPI JSON (or a news_cache document)"""
+        source = data.get("source")
+        alternates = data.get("alternate_sources") or ()
+        return cls(
+            url=data["url"],
+            title=data.get("title"),
+            description=data.get("description"),
+            source=source.get("name") if isinstance(source, dict) else source,
+            author=data.get("author"),
+            image=data.get("urlToImage"),
+            published_at=data.get("publishedAt"),
+            alternate_sources=tuple((_intern(alt["name"]) or "Unknown", alt["url"]) for alt in alternates)
+        )
+
+    def to_dict(self) -> Dict:
+        """NewsAPI-shaped JSON, used for the Mongo news_cache"""
+        data = {
+            "source": {"name": self.source},
+            "author": self.author,
+            "title": self.title,
+            "description": self.description,
+            "url": self.url,
+            "urlToImage": self.image,
+            "publishedAt": self.published_at,
+        }
+        if self.alternate_sources:
+            data["alternate_sources"] = [{"name": name, "url": url} for name, url in self.alternate_sources]
+        return data
+
+    def content_key(self) -> Tuple:
+        """Fields that come from NewsAPI, for spotting changed copies of a URL"""
+        return (self.title, self.description, self.source, self.author, self.image, self.published_at)
+
+    def with_alternate(self, name: str, url: str) -> "Article":
+        """Copy of this article with one more outlet listed under alternate_sources"""
+        if url == self.url or any(alt_url == url for _, alt_url in self.alternate_sources):
+            return self
+        return self.with_alternates(self.alternate_sources + ((_intern(name) or "Unknown", url),))
+
+    def with_alternates(self, alternate_sources: Tuple[Tuple[str, str], ...]) -> "Article":
+        article = Article.__new__(Article)
+        for name in Article.__slots__[:-1]:
+            object.__setattr__(article, name, getattr(self, name))
+        object.__setattr__(article, "alternate_sources", alternate_sources)
+        return article
+
+# Sort orders offered by NewsPaginator: (key function, newest/highest first)
+SORT_ORDERS: Dict[str, Tuple[Callable[[Article], Any], bool]] = {
+    "date": (lambda a: a.published_ts if a.published_ts is not None else float("-inf"), True),
+    "title": (lambda a: (a.title or "").casefold(), False),
+    "source": (lambda a: (a.source or "").casefold(), False),
+}
+
+class ArticleFeed(Sequence):
+    """Immutable list of articles as cached under one api_cache key.
+
+    Sort orders are computed once per feed as index permutations and
+    reused by every paginator showing it. `head` returns memoized
+    prefixes, so commands asking for the same count share one feed too.
+    """
+
+    __slots__ = ("articles", "_orders", "_heads")
+
+    def __init__(self, articles: Iterable[Article] = ()):
+        self.articles: Tuple[Article, ...] = tuple(articles)
+        self._orders: Dict[str, Tuple[int, ...]] = {}
+        self._heads: Dict[int, "ArticleFeed"] = {}
+
+    def __len__(self) -> int:
+        return len(self.articles)
+
+    def __getitem__(self, index):
+        return self.articles[index]
+
+    def __iter__(self):
+        return iter(self.articles)
+
+    def __repr__(self) -> str:
+        return f"ArticleFeed({len(self.articles)} articles)"
+
+    def head(self, count: int) -> "ArticleFeed":
+        """The first `count` articles as a feed of their own"""
+        if count >= len(self.articles):
+            return self
+        feed = self._heads.get(count)
+        if feed is None:
+            feed = self._heads[count] = ArticleFeed(self.articles[:count])
+        return feed
+
+    def sort_order(self, sort_by: str) -> Tuple[int, ...]:
+        """Indexes of the articles in `sort_by` order (see SORT_ORDERS)"""
+        order = self._orders.get(sort_by)
+        if order is None:
+            key, reverse = SORT_ORDERS[sort_by]
+            keys = [key(article) for article in self.articles]
+            order = tuple(sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse))
+            self._orders[sort_by] = order
+        return order
+
+class ArticleStore:
+    """Content-addressed article store keyed by URL.
+
+    Interning the same URL again returns the existing instance unless
+    NewsAPI changed the article, so every cache entry holding a story
+    points at one object. Entries are weak and disappear once no cache,
+    index or paginator references them.
+    """
+
+    def __init__(self):
+        self._articles: "weakref.WeakValueDictionary[str, Article]" = weakref.WeakValueDictionary()
+        self.stats = {"interned": 0, "reused": 0}
+
+    def __len__(self) -> int:
+        return len(self._articles)
+
+    def get(self, url: str) -> Optional[Article]:
+        return self._articles.get(url)
+
+    def put(self, article: Article) -> Article:
+        self._articles[article.url] = article
+        return article
+
+    def intern(self, data: Dict) -> Optional[Article]:
+        """Get the shared Article for a NewsAPI article dict, or None if it has no URL"""
+        url = data.get("url")
+        if not url:
+            return None
+        self.stats["interned"] += 1
+        article = Article.from_dict(data)
+        existing = self._articles.get(url)
+        if existing is not None and existing.content_key() == article.content_key():
+            self.stats["reused"] += 1
+            return existing
+        if existing is not None and existing.alternate_sources and not article.alternate_sources:
+            article = article.with_alternates(existing.alternate_sources)
+        return self.put(article)
+
+    def intern_many(self, items: Iterable[Dict]) -> Tuple[Article, ...]:
+        return tuple(article for article in map(self.intern, items) if article is not None)
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats, articles=len(self._articles))
+
+article_store = ArticleStore()
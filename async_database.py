@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pymongo
+
+import database
+from cache import TTLCache
+from metrics import mongo_latency
+from tracing import annotate, span
+from database import UserProfile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = float(os.getenv("MONGODB_OP_TIMEOUT_SECONDS", "3"))
+# Seconds allowed per operation; anything not listed uses DEFAULT_TIMEOUT
+OPERATION_TIMEOUTS: Dict[str, float] = {
+    "ping": 2,
+    "get_all_categories": 5,
+    "cache_news_articles": 15,
+    "clear_expired_cache": 30,
+    "get_registered_user_ids": 30,
+    "get_country_popularity": 10,
+    "get_digest_groups": 30,
+    "get_guild_channels_by_shard": 30,
+    "get_recent_cached_articles": 30,
+}
+
+# Registration is effectively permanent, so registered IDs are cached for the
+# life of the process (LRU-bounded); unregistered users are always rechecked
+REGISTRATION_CACHE_SIZE = int(os.getenv("REGISTRATION_CACHE_SIZE", "100000"))
+_registered_users = TTLCache(max_entries=REGISTRATION_CACHE_SIZE)
+
+# Profiles are invalidated by the setters below; the TTL only bounds staleness
+# from writes made by other processes
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL_SECONDS", "600"))
+_profiles = TTLCache(max_entries=PROFILE_CACHE_SIZE, default_ttl=PROFILE_CACHE_TTL)
+
+# Blocking pymongo calls run here, one thread per pooled connection, so database
+# round trips never stall the event loop
+_executor = ThreadPoolExecutor(max_workers=database.MONGO_POOL_SIZE, thread_name_prefix="mongo")
+
+def _call_with_deadline(func: Callable, timeout: float, args: tuple) -> Any:
+    with pymongo.timeout(timeout):
+        return func(*args)
+
+async def run_db(func: Callable, *args, timeout: Optional[float] = None) -> Any:
+    """Run a blocking database function off the event loop with a deadline"""
+    if timeout is None:
+        timeout = OPERATION_TIMEOUTS.get(func.__name__, DEFAULT_TIMEOUT)
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    status = "error"
+    with span(f"mongo.{func.__name__}") as db_span:
+        future = loop.run_in_executor(_executor, _call_with_deadline, func, timeout, args)
+        try:
+            # Small grace period so pymongo's own timeout normally fires first
+            result = await asyncio.wait_for(future, timeout + 0.5)
+            status = "ok"
+            return result
+        except asyncio.TimeoutError:
+            status = "timeout"
+            logger.error(f"Database operation {func.__name__} timed out after {timeout}s")
+            raise
+        except pymongo.errors.PyMongoError as e:
+            if e.timeout:
+                status = "timeout"
+            raise
+        finally:
+            mongo_latency.labels(func.__name__, status).observe(time.perf_counter() - start)
+            if db_span is not None:
+                db_span.attrs["status"] = status
+
+def shutdown():
+    """Stop accepting new database work"""
+    _executor.shutdown(wait=False)
+
+async def ping():
+    await run_db(database.ping)
+
+async def warm_registration_cache() -> int:
+    """Load registered user IDs into the registration cache in one bulk query"""
+    user_ids = await run_db(database.get_registered_user_ids, REGISTRATION_CACHE_SIZE)
+    for user_id in user_ids:
+        _registered_users.set(user_id, True)
+    logger.info(f"Registration cache warmed with {len(user_ids)} users")
+    return len(user_ids)
+
+def registration_cache_stats() -> Dict[str, int]:
+    return _registered_users.stats()
+
+async def is_registered(user_id) -> bool:
+    if _registered_users.get(user_id):
+        annotate(registration_cache="hit")
+        return True
+    annotate(registration_cache="miss")
+    registered = await run_db(database.is_registered, user_id)
+    if registered:
+        _registered_users.set(user_id, True)
+    return registered
+
+async def register_user(user_id):
+    await run_db(database.register_user, user_id)
+    _registered_users.set(user_id, True)
+
+async def get_user_profile(user_id) -> UserProfile:
+    profile = _profiles.get(user_id)
+    if profile is None:
+        annotate(profile_cache="miss")
+        profile = await run_db(database.get_user_profile, user_id)
+        _profiles.set(user_id, profile)
+    else:
+        annotate(profile_cache="hit")
+    return profile
+
+def profile_cache_stats() -> Dict[str, int]:
+    return _profiles.stats()
+
+async def set_user_country(user_id, country):
+    await run_db(database.set_user_country, user_id, country)
+    _profiles.pop(user_id)
+
+async def get_user_country(user_id) -> str:
+    return (await get_user_profile(user_id)).country
+
+async def set_user_languages(user_id, languages):
+    await run_db(database.set_user_languages, user_id, languages)
+    _profiles.pop(user_id)
+
+async def get_user_languages(user_id) -> List[str]:
+    return list((await get_user_profile(user_id)).languages)
+
+async def set_user_daily_news(user_id, enabled: bool):
+    await run_db(database.set_user_daily_news, user_id, enabled)
+    _profiles.pop(user_id)
+
+async def get_digest_groups() -> List[Tuple[str, Tuple[str, ...], List[int]]]:
+    return await run_db(database.get_digest_groups)
+
+async def get_country_popularity() -> Dict[str, int]:
+    return await run_db(database.get_country_popularity)
+
+async def get_all_categories() -> Dict[str, str]:
+    return await run_db(database.get_all_categories)
+
+async def set_guild_news_channel(guild_id, channel_id):
+    await run_db(database.set_guild_news_channel, guild_id, channel_id)
+
+async def get_guild_news_channel(guild_id) -> Optional[int]:
+    return await run_db(database.get_guild_news_channel, guild_id)
+
+async def clear_guild_news_channel(guild_id):
+    await run_db(database.clear_guild_news_channel, guild_id)
+
+async def get_guild_channels_by_shard(shard_count: int) -> Dict[int, List[Tuple[int, int]]]:
+    return await run_db(database.get_guild_channels_by_shard, shard_count)
+
+async def cache_news_article(url: str, article_data: Dict):
+    await run_db(database.cache_news_article, url, article_data)
+
+async def cache_news_articles(articles: List[Dict]) -> int:
+    return await run_db(database.cache_news_articles, articles)
+
+async def get_cached_article(url: str) -> Optional[Dict]:
+    return await run_db(database.get_cached_article, url)
+
+async def get_recent_cached_articles(limit: int) -> List[Tuple[Dict, datetime]]:
+    return await run_db(database.get_recent_cached_articles, limit)
+
+async def clear_expired_cache():
+    await run_db(database.clear_expired_cache)
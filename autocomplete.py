@@ -0,0 +1,124 @@
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from discord import app_commands
+
+from async_database import get_all_categories
+
+logger = logging.getLogger(__name__)
+
+MAX_CHOICES = 25  # Discord rejects autocomplete responses with more
+CATEGORY_REFRESH_MINUTES = int(os.getenv("CATEGORY_REFRESH_MINUTES", "10"))
+
+COUNTRIES = [
+    ("us", "United States"),
+    ("in", "India"),
+    ("gb", "United Kingdom"),
+    ("au", "Australia"),
+    ("ca", "Canada"),
+    ("de", "Germany"),
+    ("fr", "France"),
+    ("jp", "Japan"),
+    ("br", "Brazil"),
+    ("mx", "Mexico"),
+    ("es", "Spain"),
+    ("it", "Italy"),
+    ("ru", "Russia"),
+    ("cn", "China"),
+    ("kr", "South Korea")
+]
+
+# Match quality, best first: start of the whole text, start of a word, anywhere else
+_TEXT_START, _WORD_START, _INSIDE = 0, 1, 2
+
+class _Node:
+    __slots__ = ("children", "ranked", "choices")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.ranked: Dict[int, Tuple[int, int]] = {}  # choice position -> best (match quality, key order)
+        self.choices: List[app_commands.Choice] = []
+
+class ChoiceIndex:
+    """Suffix trie answering prefix and substring autocomplete queries.
+
+    Every suffix of every search key is inserted, so any substring of a key
+    leads to one node. Each node stores its best MAX_CHOICES choices, already
+    ranked (prefix matches before word-start matches before the rest), and a
+    lookup is a walk of len(query) steps. Built once; rebuild to change it.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[app_commands.Choice, Iterable[str]]]):
+        self.entries = [(choice, tuple(key.lower() for key in keys if key)) for choice, keys in entries]
+        self._root = _Node()
+        for position, (_, keys) in enumerate(self.entries):
+            for key_order, key in enumerate(keys):
+                self._insert(position, key_order, key)
+        self._finalize(self._root)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _insert(self, position: int, key_order: int, key: str):
+        for start in range(len(key)):
+            if start == 0:
+                quality = _TEXT_START
+            elif not key[start - 1].isalnum() and key[start].isalnum():
+                quality = _WORD_START
+            else:
+                quality = _INSIDE
+            node = self._root
+            self._rank(node, position, (quality, key_order))
+            for char in key[start:]:
+                node = node.children.setdefault(char, _Node())
+                self._rank(node, position, (quality, key_order))
+
+    @staticmethod
+    def _rank(node: _Node, position: int, rank: Tuple[int, int]):
+        best = node.ranked.get(position)
+        if best is None or rank < best:
+            node.ranked[position] = rank
+
+    def _finalize(self, node: _Node):
+        best = sorted(node.ranked, key=lambda position: (node.ranked[position], position))[:MAX_CHOICES]
+        node.choices = [self.entries[position][0] for position in best]
+        node.ranked = {}
+        for child in node.children.values():
+            self._finalize(child)
+
+    def search(self, query: str) -> List[app_commands.Choice]:
+        """Best choices whose keys contain `query`, at most MAX_CHOICES"""
+        node: Optional[_Node] = self._root
+        for char in query.strip().lower():
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.choices
+
+def _country_index() -> ChoiceIndex:
+    return ChoiceIndex(
+        (app_commands.Choice(name=f"{name} ({code})", value=code), (code, name))
+        for code, name in COUNTRIES
+    )
+
+def _category_index(categories: Dict[str, str]) -> ChoiceIndex:
+    return ChoiceIndex(
+        (app_commands.Choice(name=f"{cat.capitalize()} - {desc[:50]}...", value=cat), (cat, desc))
+        for cat, desc in sorted(categories.items())
+    )
+
+country_index = _country_index()
+category_index = _category_index({})
+_loaded_categories: Optional[Dict[str, str]] = None
+
+async def refresh_category_index() -> bool:
+    """Reload categories from Mongo, rebuilding the index if they changed"""
+    global category_index, _loaded_categories
+    categories = await get_all_categories()
+    if categories == _loaded_categories:
+        return False
+    category_index = _category_index(categories)
+    _loaded_categories = categories
+    logger.info(f"Category autocomplete index built with {len(categories)} categories")
+    return True
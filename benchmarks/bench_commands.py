@@ -0,0 +1,268 @@
+"""End-to-end slash command benchmark with no Discord, NewsAPI or Atlas.
+
+Runs the real command callbacks from commands.py against a fake NewsAPI
+(fake_newsapi.py), an in-memory database (memory_db.py) and fake
+interactions (fake_discord.py), then reports throughput and p50/p95/p99
+latency per command, plus per-stage timings from the interaction traces.
+
+Run from the repository root:
+
+    python benchmarks/bench_commands.py --requests 500 --concurrency 20 --output results.json
+    python benchmarks/bench_commands.py --baseline results.json  # compare against an earlier run
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+COUNTRIES = ("us", "gb", "in", "au", "ca", "de", "fr", "jp")
+CATEGORIES = ("general", "technology", "business", "sports", "entertainment")
+QUERIES = ("ai", "climate", "election", "football", "markets", "space", "chips", "energy",
+           "housing", "vaccines", "rockets", "banks")
+STAGES = ("check.registration", "defer", "fetch", "render", "reply")
+
+# Arguments for each benchmarkable command, drawn per request
+COMMAND_PARAMS: Dict[str, Callable[[random.Random], Dict[str, Any]]] = {
+    "news": lambda rng: {"count": 5},
+    "category": lambda rng: {"category": rng.choice(CATEGORIES), "count": 5},
+    "search": lambda rng: {"query": rng.choice(QUERIES), "count": 5},
+    "trending": lambda rng: {"count": 5},
+    "flashnews": lambda rng: {"count": 5},
+    "help": lambda rng: {"command": None},
+    "setcountry": lambda rng: {"country": rng.choice(COUNTRIES)},
+    "dailynews": lambda rng: {"on_off": rng.choice(("on", "off"))},
+}
+DEFAULT_COMMANDS = ("news", "category", "search", "trending", "flashnews", "help")
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _configure_environment(args) -> int:
+    """Point the bot at local fakes before any of its modules read the environment"""
+    port = _free_port()
+    os.environ["NEWS_API_BASE_URL"] = f"http://127.0.0.1:{port}"
+    os.environ["NEWS_API_KEY"] = "benchmark"
+    os.environ["MONGODB_URI"] = "mongodb://benchmark.invalid"
+    # No quota pressure or trace logging unless asked for
+    os.environ.setdefault("NEWS_API_DAILY_QUOTA", "1000000000")
+    os.environ.setdefault("NEWS_API_BURST", "1000000000")
+    os.environ.setdefault("TRACE_SAMPLE_RATE", "0")
+    os.environ.setdefault("TRACE_SLOW_MS", "inf")
+    os.environ.setdefault("TRACE_BUFFER_SIZE", "1")
+    return port
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _summary(values_ms: List[float]) -> Dict[str, float]:
+    from utils import percentile
+
+    values = sorted(values_ms)
+    if not values:
+        return {}
+    return {
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+        "mean": round(sum(values) / len(values), 3),
+        "max": round(values[-1], 3),
+    }
+
+def _stage_durations(trace) -> Dict[str, float]:
+    return {child.name: child.duration_ms for child in trace.children if child.name in STAGES}
+
+async def run_command(tree, name: str, args, user_ids: List[int], rng: random.Random) -> Dict:
+    from fake_discord import FakeInteraction, invoke
+
+    command = tree.get_command(name)
+    latency = args.discord_latency_ms / 1000
+    latencies: List[float] = []
+    acks: List[float] = []
+    stages: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    statuses: Dict[str, int] = {}
+    errors: List[str] = []
+    total = args.warmup + args.requests
+    issued = 0
+
+    async def worker():
+        nonlocal issued
+        while issued < total:
+            measured = issued >= args.warmup
+            issued += 1
+            interaction = FakeInteraction(command, rng.choice(user_ids), latency=latency)
+            start = time.perf_counter()
+            status = await invoke(tree, interaction, COMMAND_PARAMS[name](rng))
+            elapsed = (time.perf_counter() - start) * 1000
+            if not measured:
+                continue
+            statuses[status] = statuses.get(status, 0) + 1
+            if interaction.error is not None and len(errors) < 5:
+                errors.append(repr(interaction.error))
+            latencies.append(elapsed)
+            if interaction.acknowledged_at is not None:
+                acks.append((interaction.acknowledged_at - start) * 1000)
+            if interaction.trace is not None:
+                for stage, duration in _stage_durations(interaction.trace).items():
+                    stages[stage].append(duration)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    result = {
+        "requests": len(latencies),
+        "statuses": statuses,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "latency_ms": _summary(latencies),
+        "ack_ms": _summary(acks),
+        "stages_ms": {stage: _summary(values) for stage, values in stages.items() if values},
+    }
+    if errors:
+        result["errors"] = errors
+    return result
+
+def _reset_caches():
+    import async_database
+    import news_api
+    import views
+
+    news_api.api_cache.clear()
+    views.embed_cache.clear()
+    async_database._profiles.clear()
+
+async def run(args, port: int) -> Dict:
+    import database
+    from memory_db import InMemoryDatabase
+
+    database.db = InMemoryDatabase(latency=args.db_latency_ms / 1000)
+    database.init_db()
+
+    import async_database
+    import commands
+    import news_api
+    from discord.ext import commands as ext_commands
+    import discord
+    from fake_newsapi import FakeNewsAPI
+    from persistence import article_writer
+
+    rng = random.Random(args.seed)
+    user_ids = list(range(1, args.users + 1))
+    database.db.user_preferences.insert_many(
+        {"user_id": user_id, "country": rng.choice(COUNTRIES), "languages": ["en"]} for user_id in user_ids
+    )
+
+    payloads = {}
+    if args.payloads:
+        with open(args.payloads) as f:
+            payloads = json.load(f)
+    server = FakeNewsAPI(payloads, latency=args.newsapi_latency_ms / 1000, jitter=args.newsapi_jitter_ms / 1000,
+                         error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, seed=args.seed)
+    await server.start(port=port)
+
+    bot = ext_commands.Bot(command_prefix="!", intents=discord.Intents.none(), tree_cls=commands.NewsCommandTree)
+    await async_database.warm_registration_cache()
+    await news_api.load_search_index()
+    background = asyncio.all_tasks()
+    await commands.setup_commands(bot)
+    # The bot's periodic loops (cache clearing, warming) would hit the fake API mid-run
+    for task in asyncio.all_tasks() - background:
+        task.cancel()
+
+    results = {}
+    try:
+        for name in args.commands:
+            if args.cold:
+                _reset_caches()
+            results[name] = await run_command(bot.tree, name, args, user_ids, rng)
+            print(_format_row(name, results[name]), flush=True)
+    finally:
+        await article_writer.stop()
+        await news_api.close_http_session()
+        await server.stop()
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        },
+        "commands": results,
+        "newsapi": {"responses": dict(server.requests), "fetch": news_api.get_fetch_stats(),
+                    "upstream": news_api.get_upstream_stats()},
+    }
+
+def _format_row(name: str, result: Dict) -> str:
+    latency = result["latency_ms"]
+    return (f"/{name:<11}{result['requests']:>7}{result['throughput_rps']:>10.1f}"
+            f"{latency.get('p50', 0):>10.2f}{latency.get('p95', 0):>10.2f}{latency.get('p99', 0):>10.2f}"
+            f"  {result['statuses']}")
+
+def _compare(results: Dict, baseline: Dict):
+    print(f"\n{'vs baseline':<12}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}"
+          f"   (baseline commit {(baseline['meta'].get('commit') or 'unknown')[:10]})")
+    for name, result in results["commands"].items():
+        before = baseline["commands"].get(name)
+        if not before:
+            continue
+        cells = []
+        for current, previous in [(result["throughput_rps"], before["throughput_rps"])] + [
+            (result["latency_ms"].get(q), before["latency_ms"].get(q)) for q in ("p50", "p95", "p99")
+        ]:
+            cells.append(f"{(current - previous) / previous * 100:>+9.1f}%" if current and previous else f"{'-':>10}")
+        print(f"/{name:<11}" + "".join(cells))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commands", nargs="+", default=list(DEFAULT_COMMANDS), choices=sorted(COMMAND_PARAMS))
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per command")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per command")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--cold", action="store_true", help="clear in-process caches before each command")
+    parser.add_argument("--payloads", help="payload file from fake_newsapi.py record")
+    parser.add_argument("--newsapi-latency-ms", type=float, default=80)
+    parser.add_argument("--newsapi-jitter-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of NewsAPI calls answered 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share answered 429")
+    parser.add_argument("--db-latency-ms", type=float, default=2)
+    parser.add_argument("--discord-latency-ms", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    port = _configure_environment(args)
+    import database  # noqa: F401 - configures logging on import, so override it afterwards
+    logging.getLogger().setLevel(args.log_level)
+
+    print(f"{'command':<12}{'requests':>7}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  statuses")
+    results = asyncio.run(run(args, port))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            _compare(results, json.load(f))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Micro-benchmark: legacy utils.format_date vs. timeparse.
+
+Run from the repository root: python benchmarks/bench_timeparse.py
+"""
+import os
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from timeparse import format_timestamp, parse_timestamp  # noqa: E402
+
+SAMPLES = {
+    "newsapi iso": ("2024-03-05T14:07:09Z", "Reuters"),
+    "iso with fraction": ("2024-03-05T14:07:09.123456Z", "Reuters"),
+    "rfc 2822": ("Tue, 05 Mar 2024 14:07:09 +0000", "RSS Feed"),
+    "last format": ("March 05, 2024 14:07:09", "Blog"),
+    "unparseable": ("yesterday", "Blog"),
+}
+
+def legacy_format_date(date_str: str) -> str:
+    """utils.format_date before timeparse: up to six strptime attempts"""
+    try:
+        formats = [
+            "%Y-%m-%dT%H:%M:%SZ",
+            "%Y-%m-%dT%H:%M:%S.%fZ",
+            "%a, %d %b %Y %H:%M:%S %z",
+            "%Y-%m-%d %H:%M:%S",
+            "%d %b %Y %H:%M:%S",
+            "%B %d, %Y %H:%M:%S"
+        ]
+        for fmt in formats:
+            try:
+                date = datetime.strptime(date_str, fmt)
+                return date.strftime("%B %d, %Y at %I:%M %p")
+            except ValueError:
+                continue
+        return date_str
+    except:
+        return date_str
+
+def format_date(date_str: str, source: str) -> str:
+    """utils.format_date equivalent, with the per-source memo in play"""
+    timestamp = parse_timestamp(date_str, source)
+    return format_timestamp(timestamp) if timestamp is not None else date_str
+
+def bench(func, *args, number: int = 20000) -> float:
+    return min(timeit.repeat(lambda: func(*args), number=number, repeat=5)) / number * 1e6
+
+def main():
+    print(f"{'input':<20}{'legacy us':>12}{'parse us':>12}{'format us':>12}{'speedup':>10}")
+    for name, (value, source) in SAMPLES.items():
+        assert legacy_format_date(value) == format_date(value, source), name
+        legacy = bench(legacy_format_date, value)
+        parse = bench(parse_timestamp, value, source)
+        formatted = bench(format_date, value, source)
+        print(f"{name:<20}{legacy:>12.2f}{parse:>12.2f}{formatted:>12.2f}{legacy / formatted:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Fake discord.Interaction objects for driving the real command callbacks.
+
+Only the attributes the bot's commands, checks and NewsCommandTree touch
+are provided. Every Discord REST call (defer, send_message, followup.send,
+edit_original_response, DMs) sleeps for `latency` seconds instead of going
+over the network, and the interaction records when it was first acknowledged.
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+import discord
+from discord import app_commands
+from discord.utils import maybe_coroutine
+
+from commands import record_command_latency
+from tracing import Span
+
+class FakeUser:
+    def __init__(self, user_id: int, latency: float = 0.0):
+        self.id = user_id
+        self.name = f"user{user_id}"
+        self.mention = f"<@{user_id}>"
+        self._latency = latency
+
+    async def send(self, content: Optional[str] = None, **kwargs):
+        await asyncio.sleep(self._latency)
+
+class FakeGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+
+class FakeResponse:
+    def __init__(self, interaction: "FakeInteraction"):
+        self._interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def _respond(self, kind: str, kwargs: Dict[str, Any]):
+        if self._done:
+            raise discord.InteractionResponded(self._interaction)
+        await asyncio.sleep(self._interaction.latency)
+        self._done = True
+        self._interaction._record(kind, kwargs)
+
+    async def defer(self, *, thinking: bool = False, ephemeral: bool = False):
+        await self._respond("defer", {})
+
+    async def send_message(self, content: Optional[str] = None, **kwargs):
+        await self._respond("send_message", dict(kwargs, content=content))
+
+class FakeFollowup:
+    def __init__(self, interaction: "FakeInteraction"):
+        self._interaction = interaction
+
+    async def send(self, content: Optional[str] = None, **kwargs):
+        await asyncio.sleep(self._interaction.latency)
+        self._interaction._record("followup", dict(kwargs, content=content))
+
+class FakeInteraction:
+    """Slash command interaction for `command`, as seen by NewsCommandTree"""
+    type = discord.InteractionType.application_command
+
+    def __init__(self, command: app_commands.Command, user_id: int, guild_id: int = 1,
+                 latency: float = 0.0):
+        self.command = command
+        self.data = {"name": command.name, "type": 1}
+        self.user = FakeUser(user_id, latency)
+        self.guild = FakeGuild(guild_id)
+        self.latency = latency
+        self.extras: Dict[str, Any] = {}
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.created_at = time.perf_counter()
+        self.acknowledged_at: Optional[float] = None
+        self.messages: List[Dict[str, Any]] = []
+        self.trace: Optional[Span] = None
+        self.error: Optional[BaseException] = None
+
+    def _record(self, kind: str, kwargs: Dict[str, Any]):
+        if self.acknowledged_at is None:
+            self.acknowledged_at = time.perf_counter()
+        self.messages.append(dict(kwargs, kind=kind))
+
+    async def edit_original_response(self, **kwargs):
+        await asyncio.sleep(self.latency)
+        self._record("edit", kwargs)
+
+async def invoke(tree: app_commands.CommandTree, interaction: FakeInteraction, params: Dict[str, Any]) -> str:
+    """Run one interaction through the tree's hooks, the command's checks and its callback.
+
+    Mirrors what CommandTree does for a real interaction, minus option parsing:
+    returns "ok", "check_failed" or "error" and records latency like the bot does.
+    The root trace span is kept on `interaction.trace`, the exception on `interaction.error`.
+    """
+    command = interaction.command
+    try:
+        if not await tree.interaction_check(interaction):
+            return "check_failed"
+        interaction.trace = interaction.extras.get("trace")
+        for check in command.checks:
+            if not await maybe_coroutine(check, interaction):
+                raise app_commands.CheckFailure(f"The check functions for command {command.name!r} failed.")
+        await command.callback(interaction, **params)
+    except app_commands.CheckFailure:
+        record_command_latency(interaction, "check_failed")
+        return "check_failed"
+    except Exception as e:
+        interaction.error = e
+        record_command_latency(interaction, "error")
+        return "error"
+    record_command_latency(interaction, "ok")
+    return "ok"
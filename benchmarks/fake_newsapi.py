@@ -0,0 +1,174 @@
+"""Local fake NewsAPI that replays recorded payloads.
+
+Serves /v2/top-headlines and /v2/everything with configurable latency, jitter
+and error rates. Responses come from a payload file recorded with the
+`record` subcommand (keyed by endpoint and query, apiKey excluded); requests
+with no recording get a deterministic synthetic payload instead.
+
+    python benchmarks/fake_newsapi.py record --api-key KEY --out payloads.json
+    python benchmarks/fake_newsapi.py serve --payloads payloads.json --latency-ms 80
+"""
+import argparse
+import asyncio
+import json
+import random
+import zlib
+from collections import Counter
+from typing import Dict, Mapping, Optional
+from urllib.parse import urlencode
+
+import aiohttp
+from aiohttp import web
+
+ENDPOINTS = ("top-headlines", "everything")
+
+# Feeds captured by `record`: the ones the bot's commands and warmer ask for
+RECORD_REQUESTS = (
+    [("top-headlines", {"country": country}) for country in ("us", "gb", "in", "au", "ca", "de")]
+    + [("top-headlines", {"category": category, "country": "us"})
+       for category in ("business", "technology", "sports", "entertainment", "science", "health")]
+    + [("top-headlines", {})]
+    + [("everything", {"q": query, "sortBy": "relevancy"})
+       for query in ("ai", "climate", "election", "football", "markets", "space")]
+)
+
+_WORDS = ("market", "election", "storm", "court", "launch", "budget", "league", "vaccine",
+          "merger", "protest", "satellite", "summit", "record", "strike", "festival", "startup")
+
+def payload_key(endpoint: str, params: Mapping[str, str]) -> str:
+    query = {key: value for key, value in params.items() if key != "apiKey"}
+    return f"{endpoint}?{urlencode(sorted(query.items()))}"
+
+def synthetic_payload(endpoint: str, params: Mapping[str, str], size: int = 40) -> Dict:
+    """Deterministic NewsAPI-shaped response for a request with no recording"""
+    key = payload_key(endpoint, params)
+    rng = random.Random(key)
+    articles = []
+    for i in range(size):
+        words = rng.sample(_WORDS, 4)
+        source = rng.choice(("Reuters", "BBC News", "The Verge", "Bloomberg", "ESPN", "Associated Press"))
+        articles.append({
+            "source": {"id": None, "name": source},
+            "author": rng.choice((None, "Staff", "A. Writer")),
+            "title": f"{' '.join(words).capitalize()} ({key} #{i})",
+            "description": f"{source} reports on the {words[0]} and the {words[1]} as the {words[2]} unfolds.",
+            "url": f"https://news.example/{zlib.crc32(key.encode()):08x}/{i}",
+            "urlToImage": None,
+            "publishedAt": f"2024-03-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00Z",
+            "content": None,
+        })
+    return {"status": "ok", "totalResults": size, "articles": articles}
+
+class FakeNewsAPI:
+    """aiohttp server replaying payloads with injected latency and failures.
+
+    `error_rate` is the share of requests answered with HTTP 500 and
+    `rate_limit_rate` the share answered with NewsAPI's 429 rateLimited body.
+    """
+
+    def __init__(self, payloads: Optional[Dict[str, Dict]] = None, latency: float = 0.05,
+                 jitter: float = 0.0, error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        self.payloads = payloads or {}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.requests: Counter = Counter()
+        self._rng = random.Random(seed)
+        self._runner: Optional[web.AppRunner] = None
+        self.port: Optional[int] = None
+
+        self.app = web.Application()
+        for endpoint in ENDPOINTS:
+            self.app.router.add_get(f"/v2/{endpoint}", self.handle)
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "FakeNewsAPI":
+        with open(path) as f:
+            return cls(json.load(f), **kwargs)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def _payload(self, endpoint: str, params: Mapping[str, str]) -> Dict:
+        payload = self.payloads.get(payload_key(endpoint, params))
+        if payload is None:
+            payload = synthetic_payload(endpoint, params)
+        return payload
+
+    async def handle(self, request: web.Request) -> web.Response:
+        endpoint = request.path.rsplit("/", 1)[-1]
+        delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+        await asyncio.sleep(delay)
+        roll = self._rng.random()
+        if roll < self.error_rate:
+            self.requests["500"] += 1
+            return web.json_response({"status": "error", "code": "unexpectedError"}, status=500)
+        if roll < self.error_rate + self.rate_limit_rate:
+            self.requests["429"] += 1
+            return web.json_response({"status": "error", "code": "rateLimited",
+                                      "message": "Too many requests"}, status=429)
+        self.requests["200"] += 1
+        return web.json_response(self._payload(endpoint, request.query))
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+async def record(api_key: str, out: str, base_url: str = "https://newsapi.org"):
+    """Capture real responses for RECORD_REQUESTS into a payload file"""
+    payloads = {}
+    async with aiohttp.ClientSession() as session:
+        for endpoint, params in RECORD_REQUESTS:
+            async with session.get(f"{base_url}/v2/{endpoint}", params=dict(params, apiKey=api_key)) as response:
+                body = await response.json()
+            if body.get("status") != "ok":
+                print(f"skipping {endpoint} {params}: {body.get('message')}")
+                continue
+            payloads[payload_key(endpoint, params)] = body
+            print(f"recorded {endpoint} {params}: {len(body.get('articles', []))} articles")
+    with open(out, "w") as f:
+        json.dump(payloads, f)
+
+async def serve(args):
+    payloads = {}
+    if args.payloads:
+        with open(args.payloads) as f:
+            payloads = json.load(f)
+    server = FakeNewsAPI(payloads, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                         error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate)
+    await server.start(port=args.port)
+    print(f"Fake NewsAPI on {server.base_url} ({len(payloads)} recorded payloads)")
+    await asyncio.Event().wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="record real NewsAPI responses")
+    rec.add_argument("--api-key", required=True)
+    rec.add_argument("--out", default="payloads.json")
+    srv = sub.add_parser("serve", help="run the fake server")
+    srv.add_argument("--payloads")
+    srv.add_argument("--port", type=int, default=8765)
+    srv.add_argument("--latency-ms", type=float, default=50)
+    srv.add_argument("--jitter-ms", type=float, default=0)
+    srv.add_argument("--error-rate", type=float, default=0)
+    srv.add_argument("--rate-limit-rate", type=float, default=0)
+    args = parser.parse_args()
+    if args.command == "record":
+        asyncio.run(record(args.api_key, args.out))
+    else:
+        asyncio.run(serve(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""In-memory stand-in for the MongoDB database used by database.py.
+
+Implements just the collection methods and query operators database.py
+calls, so the real database and async_database code paths run unchanged:
+
+    import database
+    database.db = InMemoryDatabase(latency=0.002)
+
+`latency` adds a blocking sleep to every operation, like an Atlas round
+trip; it runs on async_database's executor threads, as real calls do.
+"""
+import copy
+import itertools
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+_MISSING = object()
+
+def _get(doc: Dict, path: str) -> Any:
+    value: Any = doc
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+def _matches_condition(value: Any, condition: Any) -> bool:
+    if not isinstance(condition, dict) or not any(key.startswith("$") for key in condition):
+        return value is not _MISSING and value == condition
+    for op, operand in condition.items():
+        if op == "$exists":
+            if (value is not _MISSING) != bool(operand):
+                return False
+        elif op == "$in":
+            if value is _MISSING or value not in operand:
+                return False
+        elif value is _MISSING:
+            return False
+        elif op == "$gte" and not value >= operand:
+            return False
+        elif op == "$gt" and not value > operand:
+            return False
+        elif op == "$lte" and not value <= operand:
+            return False
+        elif op == "$lt" and not value < operand:
+            return False
+        elif op == "$ne" and value == operand:
+            return False
+        elif op not in ("$gte", "$gt", "$lte", "$lt", "$ne"):
+            raise NotImplementedError(f"Query operator {op}")
+    return True
+
+def _matches(doc: Dict, query: Dict) -> bool:
+    return all(_matches_condition(_get(doc, field), condition) for field, condition in query.items())
+
+def _project(doc: Dict, projection: Optional[Dict]) -> Dict:
+    if not projection:
+        return copy.deepcopy(doc)
+    include_id = projection.get("_id", 1)
+    fields = [field for field, flag in projection.items() if field != "_id" and flag]
+    if fields:
+        result = {field: copy.deepcopy(doc[field]) for field in fields if field in doc}
+    else:
+        excluded = {field for field, flag in projection.items() if not flag}
+        result = {field: copy.deepcopy(value) for field, value in doc.items() if field not in excluded}
+    if include_id and "_id" in doc:
+        result["_id"] = doc["_id"]
+    else:
+        result.pop("_id", None)
+    return result
+
+def _evaluate(expression: Any, doc: Dict) -> Any:
+    """Aggregation expressions used by database.py: $field, $toLower, $ifNull and nested dicts"""
+    if isinstance(expression, str) and expression.startswith("$"):
+        value = _get(doc, expression[1:])
+        return None if value is _MISSING else value
+    if isinstance(expression, dict):
+        if "$toLower" in expression:
+            value = _evaluate(expression["$toLower"], doc)
+            return "" if value is None else str(value).lower()
+        if "$ifNull" in expression:
+            value, default = expression["$ifNull"]
+            value = _evaluate(value, doc)
+            return _evaluate(default, doc) if value is None else value
+        return {key: _evaluate(value, doc) for key, value in expression.items()}
+    if isinstance(expression, list):
+        return [_evaluate(value, doc) for value in expression]
+    return expression
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return tuple((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+class UpdateResult:
+    def __init__(self, matched_count: int, modified_count: int, upserted_id: Any = None):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+
+class DeleteResult:
+    def __init__(self, deleted_count: int):
+        self.deleted_count = deleted_count
+
+class BulkWriteResult:
+    def __init__(self):
+        self.matched_count = 0
+        self.modified_count = 0
+        self.upserted_count = 0
+
+class Cursor:
+    """Lazy find() result supporting sort, limit and batch_size"""
+
+    def __init__(self, collection: "Collection", query: Dict, projection: Optional[Dict]):
+        self._collection = collection
+        self._query = query
+        self._projection = projection
+        self._sort: List = []
+        self._limit = 0
+
+    def sort(self, key, direction: int = 1) -> "Cursor":
+        self._sort = list(key) if isinstance(key, list) else [(key, direction)]
+        return self
+
+    def limit(self, count: int) -> "Cursor":
+        self._limit = count
+        return self
+
+    def batch_size(self, size: int) -> "Cursor":
+        return self
+
+    def __iter__(self) -> Iterator[Dict]:
+        with self._collection.database._lock:
+            docs = self._collection._find(self._query)
+            for field, direction in reversed(self._sort):
+                docs.sort(key=lambda doc: _get(doc, field), reverse=direction < 0)
+            if self._limit:
+                docs = docs[:self._limit]
+            return iter([_project(doc, self._projection) for doc in docs])
+
+class Collection:
+    def __init__(self, database: "InMemoryDatabase", name: str):
+        self.database = database
+        self.name = name
+        self._docs: List[Dict] = []
+        self._ids = itertools.count(1)
+        # Unique single-field indexes: field -> value -> doc, so equality lookups skip the scan
+        self._indexes: Dict[str, Dict[Any, Dict]] = {}
+
+    def _find(self, query: Dict) -> List[Dict]:
+        for field, index in self._indexes.items():
+            value = query.get(field, _MISSING)
+            if value is not _MISSING and not isinstance(value, dict):
+                doc = index.get(value)
+                return [doc] if doc is not None and _matches(doc, query) else []
+        return [doc for doc in self._docs if _matches(doc, query)]
+
+    def _insert(self, doc: Dict):
+        doc.setdefault("_id", next(self._ids))
+        self._docs.append(doc)
+        self._reindex(doc)
+
+    def _reindex(self, doc: Dict):
+        for field, index in self._indexes.items():
+            if field in doc:
+                index[doc[field]] = doc
+
+    def _unindex(self, doc: Dict):
+        for field, index in self._indexes.items():
+            if index.get(doc.get(field, _MISSING)) is doc:
+                del index[doc[field]]
+
+    def _apply(self, doc: Dict, update: Dict, inserting: bool) -> bool:
+        before = copy.deepcopy(doc)
+        self._unindex(doc)
+        for op, fields in update.items():
+            if op == "$set" or (op == "$setOnInsert" and inserting):
+                for field, value in fields.items():
+                    doc[field] = copy.deepcopy(value)
+            elif op == "$unset":
+                for field in fields:
+                    doc.pop(field, None)
+            elif op != "$setOnInsert":
+                raise NotImplementedError(f"Update operator {op}")
+        self._reindex(doc)
+        return doc != before
+
+    def _update_one(self, query: Dict, update: Dict, upsert: bool) -> UpdateResult:
+        matches = self._find(query)
+        if matches:
+            return UpdateResult(1, int(self._apply(matches[0], update, inserting=False)))
+        if not upsert:
+            return UpdateResult(0, 0)
+        doc = {field: value for field, value in query.items() if not isinstance(value, dict)}
+        self._apply(doc, update, inserting=True)
+        self._insert(doc)
+        return UpdateResult(0, 0, doc["_id"])
+
+    def create_index(self, keys, unique: bool = False, **kwargs) -> str:
+        fields = [keys] if isinstance(keys, str) else [field for field, _ in keys]
+        if unique and len(fields) == 1:
+            field = fields[0]
+            self._indexes[field] = {doc[field]: doc for doc in self._docs if field in doc}
+        return "_".join(fields)
+
+    def find_one(self, query: Optional[Dict] = None, projection: Optional[Dict] = None) -> Optional[Dict]:
+        with self.database._operation():
+            matches = self._find(query or {})
+            return _project(matches[0], projection) if matches else None
+
+    def find(self, query: Optional[Dict] = None, projection: Optional[Dict] = None) -> Cursor:
+        with self.database._operation():
+            return Cursor(self, query or {}, projection)
+
+    def count_documents(self, query: Dict) -> int:
+        with self.database._operation():
+            return len(self._find(query))
+
+    def insert_one(self, doc: Dict):
+        with self.database._operation():
+            self._insert(copy.deepcopy(doc))
+
+    def insert_many(self, docs: Iterable[Dict]):
+        with self.database._operation():
+            for doc in docs:
+                self._insert(copy.deepcopy(doc))
+
+    def update_one(self, query: Dict, update: Dict, upsert: bool = False) -> UpdateResult:
+        with self.database._operation():
+            return self._update_one(query, update, upsert)
+
+    def bulk_write(self, requests, ordered: bool = True) -> BulkWriteResult:
+        with self.database._operation():
+            result = BulkWriteResult()
+            for request in requests:
+                # pymongo.UpdateOne keeps its arguments in private attributes
+                outcome = self._update_one(request._filter, request._doc, bool(request._upsert))
+                result.matched_count += outcome.matched_count
+                result.modified_count += outcome.modified_count
+                result.upserted_count += outcome.upserted_id is not None
+            return result
+
+    def delete_one(self, query: Dict) -> DeleteResult:
+        with self.database._operation():
+            matches = self._find(query)
+            if matches:
+                self._docs = [doc for doc in self._docs if doc is not matches[0]]
+                self._unindex(matches[0])
+            return DeleteResult(len(matches[:1]))
+
+    def delete_many(self, query: Dict) -> DeleteResult:
+        with self.database._operation():
+            kept = []
+            for doc in self._docs:
+                if _matches(doc, query):
+                    self._unindex(doc)
+                else:
+                    kept.append(doc)
+            deleted = len(self._docs) - len(kept)
+            self._docs = kept
+            return DeleteResult(deleted)
+
+    def aggregate(self, pipeline: List[Dict], **kwargs) -> Iterator[Dict]:
+        """$match and $group with $sum / $push accumulators"""
+        with self.database._operation():
+            docs = list(self._docs)
+            for stage in pipeline:
+                (op, spec), = stage.items()
+                if op == "$match":
+                    docs = [doc for doc in docs if _matches(doc, spec)]
+                elif op == "$group":
+                    groups: Dict[Any, Dict] = {}
+                    for doc in docs:
+                        group_id = _evaluate(spec["_id"], doc)
+                        group = groups.setdefault(_freeze(group_id), {"_id": group_id})
+                        for field, accumulator in spec.items():
+                            if field == "_id":
+                                continue
+                            (kind, expression), = accumulator.items()
+                            value = _evaluate(expression, doc)
+                            if kind == "$sum":
+                                group[field] = group.get(field, 0) + value
+                            elif kind == "$push":
+                                group.setdefault(field, []).append(value)
+                            else:
+                                raise NotImplementedError(f"Accumulator {kind}")
+                    docs = list(groups.values())
+                else:
+                    raise NotImplementedError(f"Pipeline stage {op}")
+            return iter(copy.deepcopy(docs))
+
+class InMemoryDatabase:
+    """Dict of collections, created on first access like pymongo's Database"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        # One lock for everything: executor threads call in concurrently
+        self._lock = threading.RLock()
+        self._collections: Dict[str, Collection] = {}
+
+    def __getattr__(self, name: str) -> Collection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def __getitem__(self, name: str) -> Collection:
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections.setdefault(name, Collection(self, name))
+        return collection
+
+    def _operation(self):
+        if self.latency > 0:
+            time.sleep(self.latency)
+        return self._lock
+
+    def command(self, name: str) -> Dict:
+        with self._operation():
+            return {"ok": 1.0}
@@ -1,16 +1,18 @@
 import os
-import threading
-import time
-from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from flask import Flask, request, jsonify
 import discord
 from discord.ext import commands, tasks
 import sys
 import logging
 
 from database import init_db
-from commands import setup_commands, start_scheduled_tasks
+from commands import NewsCommandTree, record_command_latency, setup_commands, start_scheduled_tasks
+from health import HealthServer
+from loopwatch import loop_watchdog
+from news_api import close_http_session, load_search_index
+from persistence import article_writer
+from views import NewsPaginator
+import async_database
 
 # --- Shorter logging configuration ---
 logging.basicConfig(
@@ -18,74 +20,38 @@ logging.basicConfig(
     format='[%(levelname)s] %(name)s: %(message)s'
 )
 logging.getLogger('discord').setLevel(logging.WARNING)
-logging.getLogger('werkzeug').setLevel(logging.WARNING)
+logging.getLogger('aiohttp.access').setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 
-# Track last health check log time
-last_health_log = datetime.now()
-
-# Rate limiting for health checks
-last_health_check = {}
-HEALTH_CHECK_INTERVAL = 5  # seconds
-
-# Initialize Flask app
-app = Flask(__name__)
-
-@app.route("/")
-def index():
-    return "Bot is running!", 200
-
-@app.route("/health")
-def health():
-    """Health check endpoint with rate limiting"""
-    current_time = time.time()
-    client_ip = request.remote_addr
-
-    # Check if this IP has made a request recently
-    if client_ip in last_health_check:
-        last_check = last_health_check[client_ip]
-        if current_time - last_check < HEALTH_CHECK_INTERVAL:
-            return jsonify({"status": "ok", "message": "Rate limited"}), 429
-
-    # Update last check time
-    last_health_check[client_ip] = current_time
-
-    # Clean up old entries (remove those older than 1 minute)
-    cutoff = current_time - 60
-    for ip in list(last_health_check.keys()):
-        if last_health_check[ip] < cutoff:
-            del last_health_check[ip]
-
-    return jsonify({
-        "status": "ok",
-        "timestamp": datetime.utcnow().isoformat(),
-        "uptime": get_uptime()
-    })
-
-def get_uptime():
-    """Get bot uptime"""
-    if not hasattr(get_uptime, 'start_time'):
-        get_uptime.start_time = datetime.utcnow()
-    uptime = datetime.utcnow() - get_uptime.start_time
-    return str(uptime)
-
-def run_web():
-    port = int(os.environ.get("PORT", 10000))
-    app.run(host="0.0.0.0", port=port, threaded=True)
-
 class NewsBot(commands.Bot):
     def __init__(self):
         intents = discord.Intents.default()
         intents.message_content = True
         intents.members = True
-        super().__init__(command_prefix="!", intents=intents)
+        super().__init__(command_prefix="!", intents=intents, tree_cls=NewsCommandTree)
+        self.health_server = HealthServer(self)
 
     async def setup_hook(self):
+        # Health checks run on the bot's event loop, so start them before the slower setup work
+        try:
+            await self.health_server.start()
+        except OSError as e:
+            logger.error(f"❌ Error starting health server: {e}")
+        try:
+            await async_database.warm_registration_cache()
+        except Exception as e:
+            logger.error(f"❌ Error warming registration cache: {e}")
+        try:
+            await load_search_index()
+        except Exception as e:
+            logger.error(f"❌ Error loading search index: {e}")
         logger.info("🔄 Setting up commands...")
         await setup_commands(self)
+        loop_watchdog.register_tree(self.tree)
+        loop_watchdog.register_view(NewsPaginator)
         logger.info("✅ Commands setup complete")
 
     async def on_ready(self):
@@ -99,6 +65,16 @@ class NewsBot(commands.Bot):
             logger.error(f"❌ Error syncing commands: {e}")
         start_scheduled_tasks(self)
 
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        record_command_latency(interaction, "ok")
+
+    async def close(self):
+        await self.health_server.stop()
+        await close_http_session()
+        await article_writer.stop()
+        async_database.shutdown()
+        await super().close()
+
 def main():
     logger.warning("🤖 Starting News Bot...")  # Use warning so it's visible in logs
     try:
@@ -108,10 +84,6 @@ def main():
         logger.error(f"❌ Database initialization error: {e}")
         sys.exit(1)
 
-    # Start Flask server in a separate thread
-    web_thread = threading.Thread(target=run_web, daemon=True)
-    web_thread.start()
-
     if not DISCORD_TOKEN:
         logger.error("❌ DISCORD_TOKEN is missing! Please check your .env file.")
         sys.exit(1)
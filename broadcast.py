@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List, Tuple
+
+import discord
+
+from async_database import get_guild_channels_by_shard, clear_guild_news_channel
+from news_api import fetch_top_headlines
+from quota import background_lane
+from ratelimit import TokenBucket, discord_send_limiter
+from utils import create_news_embed, percentile
+
+logger = logging.getLogger(__name__)
+
+BROADCAST_COUNTRY = os.getenv("BROADCAST_COUNTRY", "us")
+BROADCAST_ARTICLES = min(10, int(os.getenv("BROADCAST_ARTICLES", "3")))  # Discord allows 10 embeds per message
+BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", "16"))
+BROADCAST_MAX_RETRIES = 3
+
+class BroadcastPipeline:
+    """Posts the same pre-rendered news embeds to every guild's news channel.
+
+    Channel settings are loaded in one cursor pass and grouped by shard; each
+    shard gets its own queue and a share of the worker pool, and all sends go
+    through the token bucket shared with the daily digest. Deleted channels
+    are unset in guild_settings so later runs skip them.
+    """
+
+    def __init__(self, bot: discord.Client, concurrency: int = BROADCAST_CONCURRENCY,
+                 limiter: TokenBucket = discord_send_limiter):
+        self.bot = bot
+        self.concurrency = concurrency
+        self.limiter = limiter
+        self.last_run: Dict = {}
+
+    async def run(self) -> Dict:
+        start = time.perf_counter()
+        stats = {
+            "channels": 0,
+            "delivered": 0,
+            "failed": 0,
+            "forbidden": 0,
+            "removed": 0,
+            "retries": 0,
+        }
+        with background_lane():
+            articles = await fetch_top_headlines(country=BROADCAST_COUNTRY, count=BROADCAST_ARTICLES)
+        if not articles:
+            logger.warning("No articles to broadcast, skipping run")
+            return stats
+        embeds = [await create_news_embed(article, "📰", style="default") for article in articles]
+
+        shard_count = self.bot.shard_count or 1
+        shards = await get_guild_channels_by_shard(shard_count)
+        stats["channels"] = sum(len(targets) for targets in shards.values())
+        per_shard = max(1, self.concurrency // max(1, len(shards)))
+        latencies: List[float] = []
+        await asyncio.gather(*(
+            self._run_shard(targets, embeds, per_shard, stats, latencies, start)
+            for targets in shards.values()
+        ))
+
+        latencies.sort()
+        stats["duration_s"] = round(time.perf_counter() - start, 2)
+        stats["delivery_latency_ms"] = {
+            f"p{q}": round(percentile(latencies, q), 1) for q in (50, 95, 99)
+        }
+        self.last_run = stats
+        logger.warning(f"📢 Channel broadcast run: {stats}")
+        return stats
+
+    async def _run_shard(self, targets: List[Tuple[int, int]], embeds: List[discord.Embed],
+                         workers: int, stats: Dict, latencies: List[float], start: float):
+        queue: "asyncio.Queue[Tuple[int, int]]" = asyncio.Queue()
+        for target in targets:
+            queue.put_nowait(target)
+
+        async def worker():
+            while not queue.empty():
+                guild_id, channel_id = queue.get_nowait()
+                try:
+                    delivered = await self._deliver(guild_id, channel_id, embeds, stats)
+                except Exception as e:
+                    # Keep one channel's failure from aborting the run
+                    logger.error(f"Unexpected error broadcasting to channel {channel_id}: {e}")
+                    stats["failed"] += 1
+                    continue
+                if delivered:
+                    # Time from run start until this channel had the news
+                    latencies.append((time.perf_counter() - start) * 1000)
+
+        await asyncio.gather(*(worker() for _ in range(min(workers, len(targets)))))
+
+    async def _deliver(self, guild_id: int, channel_id: int, embeds: List[discord.Embed], stats: Dict) -> bool:
+        channel = self.bot.get_partial_messageable(channel_id, guild_id=guild_id)
+        for attempt in range(BROADCAST_MAX_RETRIES + 1):
+            await self.limiter.acquire()
+            try:
+                await channel.send(embeds=embeds)
+                stats["delivered"] += 1
+                return True
+            except discord.NotFound:
+                # Channel was deleted; stop posting to it
+                await clear_guild_news_channel(guild_id)
+                stats["removed"] += 1
+                stats["failed"] += 1
+                return False
+            except discord.Forbidden:
+                stats["forbidden"] += 1
+                stats["failed"] += 1
+                return False
+            except (discord.HTTPException, OSError, asyncio.TimeoutError) as e:
+                status = getattr(e, "status", None)
+                retryable = status is None or status >= 500 or status == 429
+                if retryable and attempt < BROADCAST_MAX_RETRIES:
+                    stats["retries"] += 1
+                    retry_after = _retry_after(e) if status == 429 else None
+                    await asyncio.sleep(retry_after or 2 ** attempt)
+                    continue
+                logger.error(f"Error broadcasting to channel {channel_id}: {e}")
+                break
+        stats["failed"] += 1
+        return False
+
+def _retry_after(error: Exception) -> float:
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("Retry-After", 0)) if response is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
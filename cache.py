@@ -0,0 +1,166 @@
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+def estimate_size(obj: Any, _depth: int = 0) -> int:
+    """Approximate the memory footprint of a JSON-like or slotted object in bytes"""
+    size = sys.getsizeof(obj)
+    if _depth > 6:
+        return size
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            size += estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += estimate_size(item, _depth + 1)
+    elif hasattr(type(obj), "__slots__"):
+        # Objects shared between entries are counted once per entry, so this is an upper bound
+        for name in type(obj).__slots__:
+            if name != "__weakref__":
+                size += estimate_size(getattr(obj, name, None), _depth + 1)
+    return size
+
+class _Entry:
+    __slots__ = ("value", "fresh_until", "expires_at", "size")
+
+    def __init__(self, value: Any, fresh_until: Optional[float], expires_at: Optional[float], size: int):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.expires_at = expires_at
+        self.size = size
+
+class TTLCache:
+    """LRU cache bounded by entry count and approximate bytes, with per-key TTL.
+
+    Expiry is checked lazily on access, so lookups stay O(1); `purge_expired`
+    sweeps the whole cache and is meant for periodic cleanup tasks.
+
+    Entries stored with a `stale_ttl` outlive their TTL by that long: `get`
+    treats them as misses, but `get_with_staleness` still returns them so
+    callers can serve stale data while refreshing it.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: Optional[int] = None,
+                 default_ttl: Optional[float] = None,
+                 sizeof: Callable[[Any], int] = estimate_size,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._sizeof = sizeof
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and not self._stale(entry, self._clock())
+
+    @staticmethod
+    def _expired(entry: _Entry, now: float) -> bool:
+        return entry.expires_at is not None and now >= entry.expires_at
+
+    @staticmethod
+    def _stale(entry: _Entry, now: float) -> bool:
+        return entry.fresh_until is not None and now >= entry.fresh_until
+
+    def _remove(self, key: Hashable) -> _Entry:
+        entry = self._data.pop(key)
+        self._bytes -= entry.size
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a live value and mark it as recently used"""
+        entry = self._lookup(key)
+        if entry is None or self._stale(entry, self._clock()):
+            self.misses += 1
+            return default
+        self.hits += 1
+        return entry.value
+
+    def get_with_staleness(self, key: Hashable) -> Optional[Tuple[Any, bool]]:
+        """Get `(value, is_stale)` for any entry still within its stale window"""
+        entry = self._lookup(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if self._stale(entry, self._clock()):
+            self.stale_hits += 1
+            return entry.value, True
+        self.hits += 1
+        return entry.value, False
+
+    def _lookup(self, key: Hashable) -> Optional[_Entry]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry, self._clock()):
+            self._remove(key)
+            self.expirations += 1
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, stale_ttl: float = 0):
+        """Store a value, evicting least recently used entries to stay within bounds"""
+        if key in self._data:
+            self._remove(key)
+        ttl = self.default_ttl if ttl is None else ttl
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Larger than the whole budget; caching it would flush everything else
+            return
+        fresh_until = self._clock() + ttl if ttl is not None else None
+        expires_at = fresh_until + stale_ttl if fresh_until is not None else None
+        self._data[key] = _Entry(value, fresh_until, expires_at, size)
+        self._bytes += size
+        while len(self._data) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes):
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def ttl_remaining(self, key: Hashable) -> Optional[float]:
+        """Seconds until a key goes stale (0 if already stale, None if absent or never stale)"""
+        entry = self._data.get(key)
+        if entry is None or self._expired(entry, self._clock()) or entry.fresh_until is None:
+            return None
+        return max(0.0, entry.fresh_until - self._clock())
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        if key not in self._data:
+            return default
+        return self._remove(key).value
+
+    def clear(self):
+        self._data.clear()
+        self._bytes = 0
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry and return how many were removed"""
+        now = self._clock()
+        expired = [k for k, e in self._data.items() if e.expires_at is not None and now >= e.expires_at]
+        for k in expired:
+            self._remove(k)
+        self.expirations += len(expired)
+        return len(expired)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
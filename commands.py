@@ -1,11 +1,14 @@
 import logging
+import datetime
+import time
+from typing import Awaitable, Callable
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
-from database import (
-    set_user_country, get_user_country, set_user_languages, get_user_languages,
+from async_database import (
+    set_user_country, get_user_country, set_user_languages, get_user_languages, get_user_profile,
     get_all_categories, is_registered, register_user,
-    set_guild_news_channel, get_guild_news_channel
+    set_guild_news_channel, get_guild_news_channel, set_user_daily_news
 )
 from news_api import (
     fetch_top_headlines, fetch_news_by_category, fetch_news_by_query, fetch_trending_news, clear_cache
@@ -13,21 +16,96 @@ from news_api import (
 from views import NewsPaginator, HelpMenuView
 from utils import create_news_embed, get_country_choices, get_category_choices, require_registration
 from onboard import ONBOARD_MSG
+from warmer import cache_warmer, WARM_INTERVAL_MINUTES
+from autocomplete import refresh_category_index, CATEGORY_REFRESH_MINUTES
+from digest import DigestEngine, DIGEST_HOUR_UTC
+from broadcast import BroadcastPipeline
+from metrics import command_latency
+from articles import ArticleFeed
+from tracing import span, start_trace, finish_trace
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+class NewsCommandTree(app_commands.CommandTree):
+    """Command tree that times and traces every slash command"""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        interaction.extras["started_at"] = time.perf_counter()
+        if interaction.type is discord.InteractionType.application_command:
+            # Root span stays current for the rest of this dispatch task
+            name = (interaction.data or {}).get("name", "unknown")
+            interaction.extras["trace"] = start_trace(f"/{name}")
+        return True
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        status = "check_failed" if isinstance(error, app_commands.CheckFailure) else "error"
+        record_command_latency(interaction, status)
+        await super().on_error(interaction, error)
+
+def record_command_latency(interaction: discord.Interaction, status: str):
+    """Observe the time since the tree started handling this interaction and close its trace"""
+    trace = interaction.extras.pop("trace", None)
+    if trace is not None:
+        finish_trace(trace, status=status)
+    started_at = interaction.extras.pop("started_at", None)
+    command = interaction.command
+    if started_at is None or command is None:
+        return
+    command_latency.labels(command.qualified_name, status).observe(time.perf_counter() - started_at)
+
+async def send_article_feed(interaction: discord.Interaction, fetch: Callable[[], Awaitable[ArticleFeed]],
+                            title: str, empty_message: str):
+    """Defer, fetch, render the first article and reply, tracing each stage"""
+    with span("defer"):
+        await interaction.response.defer(thinking=True, ephemeral=True)
+    with span("fetch") as fetch_span:
+        articles = await fetch()
+        if fetch_span is not None:
+            fetch_span.attrs["articles"] = len(articles)
+    if not articles:
+        with span("reply"):
+            await interaction.followup.send(empty_message, ephemeral=True)
+        return
+    with span("render"):
+        view = NewsPaginator(articles, interaction.user.id)
+        embed = await create_news_embed(articles[0], title, style="default")
+    with span("reply"):
+        await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+    view.mark_sent()
+
+async def _profile_country(user_id: int) -> str:
+    with span("profile"):
+        profile = await get_user_profile(user_id)
+    return profile.country
+
 async def setup_commands(bot: commands.Bot):
     tree = bot.tree
 
     @tasks.loop(minutes=15)
     async def clear_news_cache():
         """Clear expired news cache every 15 minutes"""
-        clear_cache()
+        await clear_cache()
+
+    @tasks.loop(minutes=CATEGORY_REFRESH_MINUTES)
+    async def refresh_categories():
+        """Pick up added or renamed categories for autocomplete"""
+        try:
+            await refresh_category_index()
+        except Exception as e:
+            logger.error(f"Error refreshing category index: {e}")
+
+    @tasks.loop(minutes=WARM_INTERVAL_MINUTES)
+    async def warm_news_cache():
+        """Pre-fetch popular feeds before they expire"""
+        try:
+            await cache_warmer.run_cycle()
+        except Exception as e:
+            logger.error(f"Error warming news cache: {e}")
 
     @tree.command(name="start", description="Register to use NewsBot and get started")
     async def start(interaction: discord.Interaction):
-        if is_registered(interaction.user.id):
+        if await is_registered(interaction.user.id):
             try:
                 await interaction.response.send_message(
                     "You are already registered! Use `/help` to see available commands.",
@@ -44,7 +122,7 @@ async def setup_commands(bot: commands.Bot):
                         ephemeral=True
                     )
             return
-        register_user(interaction.user.id)
+        await register_user(interaction.user.id)
         try:
             await interaction.user.send(ONBOARD_MSG)
         except Exception:
@@ -162,92 +240,111 @@ async def setup_commands(bot: commands.Bot):
     @tree.command(name="news", description="Get today's top headlines.")
     @require_registration()
     async def news(interaction: discord.Interaction, count: int = 5):
-        await interaction.response.defer(thinking=True, ephemeral=True)
-        articles = fetch_top_headlines(count=count)
-        if not articles:
-            await interaction.followup.send("No news found.", ephemeral=True)
-            return
-        view = NewsPaginator(articles, interaction.user.id)
-        embed = await create_news_embed(articles[0], "Top Headline", style="default")
-        await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+        async def fetch():
+            country = await _profile_country(interaction.user.id)
+            return await fetch_top_headlines(country=country, count=count)
+        await send_article_feed(interaction, fetch, "Top Headline", "No news found.")
 
     @tree.command(name="category", description="Get news by category.")
     @require_registration()
+    @app_commands.autocomplete(category=get_category_choices)
     async def category(interaction: discord.Interaction, category: str, count: int = 5):
-        await interaction.response.defer(thinking=True, ephemeral=True)
-        articles = fetch_news_by_category(category=category, count=count)
-        if not articles:
-            await interaction.followup.send(f"No news found for category `{category}`.", ephemeral=True)
-            return
-        view = NewsPaginator(articles, interaction.user.id)
-        embed = await create_news_embed(articles[0], f"{category.title()} News", style="default")
-        await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+        async def fetch():
+            country = await _profile_country(interaction.user.id)
+            return await fetch_news_by_category(category=category, count=count, country=country)
+        await send_article_feed(
+            interaction, fetch, f"{category.title()} News", f"No news found for category `{category}`."
+        )
 
     @tree.command(name="search", description="Search for news articles by keyword.")
     @require_registration()
     async def search(interaction: discord.Interaction, query: str, count: int = 5):
-        await interaction.response.defer(thinking=True, ephemeral=True)
-        articles = fetch_news_by_query(query=query, count=count)
-        if not articles:
-            await interaction.followup.send(f"No news found for `{query}`.", ephemeral=True)
-            return
-        view = NewsPaginator(articles, interaction.user.id)
-        embed = await create_news_embed(articles[0], f"Results for '{query}'", style="default")
-        await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+        await send_article_feed(
+            interaction, lambda: fetch_news_by_query(query=query, count=count),
+            f"Results for '{query}'", f"No news found for `{query}`."
+        )
 
     @tree.command(name="trending", description="Get trending news.")
     @require_registration()
     async def trending(interaction: discord.Interaction, count: int = 5):
-        await interaction.response.defer(thinking=True, ephemeral=True)
-        articles = fetch_trending_news(count=count)
-        if not articles:
-            await interaction.followup.send("No trending news found.", ephemeral=True)
-            return
-        view = NewsPaginator(articles, interaction.user.id)
-        embed = await create_news_embed(articles[0], "Trending News", style="default")
-        await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+        await send_article_feed(
+            interaction, lambda: fetch_trending_news(count=count), "Trending News", "No trending news found."
+        )
 
     @tree.command(name="flashnews", description="Get breaking/flash news.")
     @require_registration()
     async def flashnews(interaction: discord.Interaction, count: int = 5):
-        await interaction.response.defer(thinking=True, ephemeral=True)
         # For simplicity, just call fetch_top_headlines (or your actual flash/breaking news method)
-        articles = fetch_top_headlines(count=count)
-        if not articles:
-            await interaction.followup.send("No breaking news found.", ephemeral=True)
-            return
-        view = NewsPaginator(articles, interaction.user.id)
-        embed = await create_news_embed(articles[0], "Breaking News", style="default")
-        await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+        async def fetch():
+            country = await _profile_country(interaction.user.id)
+            return await fetch_top_headlines(country=country, count=count)
+        await send_article_feed(interaction, fetch, "Breaking News", "No breaking news found.")
 
     # Preferences: setcountry, setlang, dailynews, setchannel, etc.
     @tree.command(name="setcountry", description="Set your preferred country for news.")
     @require_registration()
+    @app_commands.autocomplete(country=get_country_choices)
     async def setcountry(interaction: discord.Interaction, country: str):
-        set_user_country(interaction.user.id, country)
+        await set_user_country(interaction.user.id, country)
         await interaction.response.send_message(f"Country set to `{country}`!", ephemeral=True)
 
     @tree.command(name="setlang", description="Set your preferred language(s) for news.")
     @require_registration()
     async def setlang(interaction: discord.Interaction, languages: str):
         langs = [lang.strip() for lang in languages.split(",")]
-        set_user_languages(interaction.user.id, langs)
+        await set_user_languages(interaction.user.id, langs)
         await interaction.response.send_message(f"Languages set to `{', '.join(langs)}`!", ephemeral=True)
 
     @tree.command(name="dailynews", description="Toggle daily news in your DMs.")
     @require_registration()
     async def dailynews(interaction: discord.Interaction, on_off: str):
-        # Add logic to enable/disable daily news if you want
-        await interaction.response.send_message(f"Daily news set to `{on_off}` (feature not implemented in this minimal version).", ephemeral=True)
+        value = on_off.strip().lower()
+        if value in ("on", "true", "yes", "enable"):
+            enabled = True
+        elif value in ("off", "false", "no", "disable"):
+            enabled = False
+        else:
+            await interaction.response.send_message("Please use `/dailynews on` or `/dailynews off`.", ephemeral=True)
+            return
+        await set_user_daily_news(interaction.user.id, enabled)
+        if enabled:
+            await interaction.response.send_message(
+                f"📬 Daily news enabled! You'll get a digest in your DMs every day at {DIGEST_HOUR_UTC:02d}:00 UTC.",
+                ephemeral=True
+            )
+        else:
+            await interaction.response.send_message("Daily news disabled.", ephemeral=True)
 
     @tree.command(name="setchannel", description="Set the server channel for daily news (admin only).")
     @require_registration()
     async def setchannel(interaction: discord.Interaction, channel: discord.TextChannel):
-        set_guild_news_channel(interaction.guild.id, channel.id)
+        await set_guild_news_channel(interaction.guild.id, channel.id)
         await interaction.response.send_message(f"Daily news channel set to {channel.mention}", ephemeral=True)
 
     clear_news_cache.start()
+    warm_news_cache.start()
+    refresh_categories.start()
+
+@tasks.loop(time=datetime.time(hour=DIGEST_HOUR_UTC, tzinfo=datetime.timezone.utc))
+async def send_daily_digest(engine: DigestEngine):
+    """Send the daily news digest to subscribed users"""
+    try:
+        await engine.run()
+    except Exception as e:
+        logger.error(f"Error sending daily digest: {e}")
+
+@tasks.loop(time=datetime.time(hour=DIGEST_HOUR_UTC, tzinfo=datetime.timezone.utc))
+async def broadcast_channel_news(pipeline: BroadcastPipeline):
+    """Post the daily news to every server's configured news channel"""
+    try:
+        await pipeline.run()
+    except Exception as e:
+        logger.error(f"Error broadcasting channel news: {e}")
 
 def start_scheduled_tasks(bot):
-    """Start all scheduled tasks"""
-    pass  # Tasks are started in setup_commands
+    """Start scheduled tasks that need a connected bot"""
+    # on_ready fires again after reconnects, so only start once
+    if not send_daily_digest.is_running():
+        send_daily_digest.start(DigestEngine(bot))
+    if not broadcast_channel_news.is_running():
+        broadcast_channel_news.start(BroadcastPipeline(bot))
@@ -1,9 +1,10 @@
 import os
-from pymongo import MongoClient, ASCENDING
+from pymongo import MongoClient, ASCENDING, UpdateOne
 from dotenv import load_dotenv
 import sys
 import logging
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 
 # Configure logging
@@ -19,6 +20,18 @@ if not MONGO_URI:
     logger.error("MONGODB_URI not found in environment variables!")
     sys.exit(1)
 
+# Connection pool tuning; the async layer runs one executor thread per pooled socket
+MONGO_POOL_SIZE = int(os.getenv("MONGODB_POOL_SIZE", "16"))
+MONGO_CLIENT_OPTIONS = {
+    "maxPoolSize": MONGO_POOL_SIZE,
+    "minPoolSize": min(2, MONGO_POOL_SIZE),
+    "maxIdleTimeMS": 60000,
+    "waitQueueTimeoutMS": 5000,
+    "serverSelectionTimeoutMS": 10000,
+    "retryReads": True,
+    "retryWrites": True,
+}
+
 # Global database connection
 client = None
 db = None
@@ -31,13 +44,13 @@ def get_db():
             # Try strict TLS first, then fallback to allow invalid certs
             try:
                 logger.info("🔗 Trying MongoDB connection with strict TLS...")
-                client = MongoClient(MONGO_URI, tls=True)
+                client = MongoClient(MONGO_URI, tls=True, **MONGO_CLIENT_OPTIONS)
                 client.admin.command('ping')
                 logger.info("✅ Successfully connected to MongoDB with strict TLS!")
             except Exception as e1:
                 logger.warning(f"⚠️ Strict TLS failed: {e1}")
                 logger.info("🔗 Retrying with tlsAllowInvalidCertificates=True...")
-                client = MongoClient(MONGO_URI, tls=True, tlsAllowInvalidCertificates=True)
+                client = MongoClient(MONGO_URI, tls=True, tlsAllowInvalidCertificates=True, **MONGO_CLIENT_OPTIONS)
                 client.admin.command('ping')
                 logger.info("✅ Successfully connected to MongoDB with fallback TLS!")
             
@@ -52,6 +65,10 @@ def get_db():
             sys.exit(1)
     return db
 
+def ping():
+    """One round trip to the server, for readiness checks"""
+    get_db().command("ping")
+
 def init_db():
     """Initialize database connection and create indexes"""
     try:
@@ -59,6 +76,7 @@ def init_db():
         
         # Create indexes
         db.user_preferences.create_index("user_id", unique=True)
+        db.user_preferences.create_index("daily_news", sparse=True)
         db.guild_settings.create_index("guild_id", unique=True)
         db.categories.create_index("name", unique=True)
         db.news_cache.create_index([("url", 1)], unique=True)
@@ -82,11 +100,25 @@ def init_db():
         logger.error(f"Failed to initialize database: {e}")
         raise
 
+@dataclass(frozen=True)
+class UserProfile:
+    """A user's news preferences, read in one query"""
+    user_id: int
+    country: str = "us"
+    languages: Tuple[str, ...] = ("en",)
+    daily_news: bool = False
+
 def is_registered(user_id):
     db = get_db()
-    doc = db.user_preferences.find_one({"user_id": user_id})
+    doc = db.user_preferences.find_one({"user_id": user_id}, {"_id": 1})
     return doc is not None
 
+def get_registered_user_ids(limit: int) -> List[int]:
+    """Get up to `limit` registered user IDs in one query"""
+    db = get_db()
+    cursor = db.user_preferences.find({}, {"user_id": 1, "_id": 0}).limit(limit)
+    return [doc["user_id"] for doc in cursor if "user_id" in doc]
+
 def register_user(user_id):
     db = get_db()
     db.user_preferences.update_one(
@@ -104,9 +136,22 @@ def set_user_country(user_id, country):
     )
 
 def get_user_country(user_id):
+    return get_user_profile(user_id).country
+
+def get_user_profile(user_id) -> UserProfile:
     db = get_db()
-    doc = db.user_preferences.find_one({"user_id": user_id})
-    return doc.get("country", "us") if doc else "us"
+    doc = db.user_preferences.find_one(
+        {"user_id": user_id},
+        {"country": 1, "languages": 1, "daily_news": 1, "_id": 0}
+    )
+    if not doc:
+        return UserProfile(user_id)
+    return UserProfile(
+        user_id,
+        country=(doc.get("country") or "us").lower(),
+        languages=tuple(doc.get("languages") or ("en",)),
+        daily_news=bool(doc.get("daily_news", False))
+    )
 
 def set_user_languages(user_id, languages):
     db = get_db()
@@ -117,9 +162,41 @@ def set_user_languages(user_id, languages):
     )
 
 def get_user_languages(user_id):
+    return list(get_user_profile(user_id).languages)
+
+def get_country_popularity() -> Dict[str, int]:
+    """Count registered users per preferred country"""
     db = get_db()
-    doc = db.user_preferences.find_one({"user_id": user_id})
-    return doc.get("languages", ["en"]) if doc else ["en"]
+    pipeline = [
+        {"$group": {"_id": {"$toLower": {"$ifNull": ["$country", "us"]}}, "users": {"$sum": 1}}}
+    ]
+    return {doc["_id"]: doc["users"] for doc in db.user_preferences.aggregate(pipeline)}
+
+def set_user_daily_news(user_id, enabled: bool):
+    db = get_db()
+    db.user_preferences.update_one(
+        {"user_id": user_id},
+        {"$set": {"daily_news": enabled}},
+        upsert=True
+    )
+
+def get_digest_groups() -> List[Tuple[str, Tuple[str, ...], List[int]]]:
+    """Group daily digest subscribers by (country, languages)"""
+    db = get_db()
+    pipeline = [
+        {"$match": {"daily_news": True}},
+        {"$group": {
+            "_id": {
+                "country": {"$toLower": {"$ifNull": ["$country", "us"]}},
+                "languages": {"$ifNull": ["$languages", ["en"]]}
+            },
+            "user_ids": {"$push": "$user_id"}
+        }}
+    ]
+    return [
+        (doc["_id"]["country"], tuple(doc["_id"]["languages"]), doc["user_ids"])
+        for doc in db.user_preferences.aggregate(pipeline, allowDiskUse=True)
+    ]
 
 def get_all_categories():
     db = get_db()
@@ -138,6 +215,25 @@ def get_guild_news_channel(guild_id):
     doc = db.guild_settings.find_one({"guild_id": guild_id})
     return doc["news_channel_id"] if doc and "news_channel_id" in doc else None
 
+def clear_guild_news_channel(guild_id):
+    db = get_db()
+    db.guild_settings.update_one({"guild_id": guild_id}, {"$unset": {"news_channel_id": ""}})
+
+def get_guild_channels_by_shard(shard_count: int, batch_size: int = 1000) -> Dict[int, List[Tuple[int, int]]]:
+    """Stream every configured news channel once and group (guild_id, channel_id) by shard"""
+    db = get_db()
+    cursor = db.guild_settings.find(
+        {"news_channel_id": {"$exists": True}},
+        {"guild_id": 1, "news_channel_id": 1, "_id": 0}
+    ).batch_size(batch_size)
+    shards: Dict[int, List[Tuple[int, int]]] = {}
+    for doc in cursor:
+        guild_id = doc["guild_id"]
+        # Discord's sharding formula
+        shard_id = (guild_id >> 22) % shard_count
+        shards.setdefault(shard_id, []).append((guild_id, doc["news_channel_id"]))
+    return shards
+
 def cache_news_article(url: str, article_data: Dict):
     """Cache a news article in the database"""
     try:
@@ -155,6 +251,23 @@ def cache_news_article(url: str, article_data: Dict):
     except Exception as e:
         logger.error(f"Error caching news article: {e}")
 
+def cache_news_articles(articles: List[Dict]) -> int:
+    """Cache many news articles with one unordered bulk upsert"""
+    if not articles:
+        return 0
+    db = get_db()
+    now = datetime.utcnow()
+    ops = [
+        UpdateOne(
+            {"url": article["url"]},
+            {"$set": {"data": article, "timestamp": now}},
+            upsert=True
+        )
+        for article in articles
+    ]
+    result = db.news_cache.bulk_write(ops, ordered=False)
+    return result.upserted_count + result.modified_count
+
 def get_cached_article(url: str) -> Optional[Dict]:
     """Get a cached news article from the database"""
     try:
@@ -172,6 +285,15 @@ def get_cached_article(url: str) -> Optional[Dict]:
         logger.error(f"Error getting cached article: {e}")
         return None
 
+def get_recent_cached_articles(limit: int) -> List[Tuple[Dict, datetime]]:
+    """Get the most recently cached articles that are still valid, newest first"""
+    db = get_db()
+    cursor = db.news_cache.find(
+        {"timestamp": {"$gte": datetime.utcnow() - timedelta(hours=1)}},
+        {"data": 1, "timestamp": 1, "_id": 0}
+    ).sort("timestamp", -1).limit(limit)
+    return [(doc["data"], doc["timestamp"]) for doc in cursor]
+
 def clear_expired_cache():
     """Clear expired cache entries"""
     try:
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from articles import Article, article_store
+
+DEDUP_MAX_FINGERPRINTS = int(os.getenv("DEDUP_MAX_FINGERPRINTS", "20000"))
+HAMMING_THRESHOLD = 3  # Max differing bits for two articles to count as the same story
+_BANDS = 4  # 4 x 16-bit bands: any pair within 3 bits agrees exactly on at least one band
+_BAND_BITS = 64 // _BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+
+_WORD_RE = re.compile(r"\w+")
+
+def _hash64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "big")
+
+def _story_text(article: Article) -> str:
+    title = article.title or ""
+    source = article.source
+    # NewsAPI titles usually end in " - Outlet Name", which differs between copies
+    if source and title.endswith(f" - {source}"):
+        title = title[:-len(source) - 3]
+    return f"{title} {article.description or ''}".lower()
+
+def simhash(text: str) -> Optional[int]:
+    """64-bit SimHash over word trigrams (single words for very short texts); None without words"""
+    words = _WORD_RE.findall(text)
+    features = [" ".join(words[i:i + 3]) for i in range(len(words) - 2)] or words
+    if not features:
+        return None
+    # Majority vote per bit; zip over the bit strings keeps the inner loop in C
+    rows = [format(_hash64(feature), "064b") for feature in features]
+    half = len(rows) / 2
+    return int("".join("1" if column.count("1") > half else "0" for column in zip(*rows)), 2)
+
+class _Cluster:
+    __slots__ = ("fingerprint", "canonical")
+
+    def __init__(self, fingerprint: int, canonical: Article):
+        self.fingerprint = fingerprint
+        self.canonical = canonical
+
+class DuplicateIndex:
+    """Incremental near-duplicate detector for ingested articles.
+
+    Each story cluster keeps one canonical article; later near-duplicates
+    (SimHash within HAMMING_THRESHOLD bits) are recorded on it under
+    `alternate_sources` instead of being stored again. Articles are
+    immutable, so the canonical copy is replaced (in the cluster and the
+    article store) whenever an alternate is added. Candidates are found
+    through banded lookup tables, and the oldest clusters are evicted once
+    `max_clusters` is reached.
+    """
+
+    def __init__(self, max_clusters: int = DEDUP_MAX_FINGERPRINTS, threshold: int = HAMMING_THRESHOLD):
+        self.max_clusters = max_clusters
+        self.threshold = threshold
+        self._clusters: "OrderedDict[str, _Cluster]" = OrderedDict()  # keyed by canonical URL
+        self._bands: Dict[Tuple[int, int], Set[str]] = {}
+        self.stats = {"checked": 0, "collapsed": 0}
+
+    def _band_keys(self, fingerprint: int):
+        for band in range(_BANDS):
+            yield band, (fingerprint >> (band * _BAND_BITS)) & _BAND_MASK
+
+    def _find(self, fingerprint: int) -> Optional[_Cluster]:
+        for key in self._band_keys(fingerprint):
+            for url in self._bands.get(key, ()):
+                cluster = self._clusters[url]
+                if bin(cluster.fingerprint ^ fingerprint).count("1") <= self.threshold:
+                    return cluster
+        return None
+
+    def _add(self, url: str, fingerprint: int, article: Article) -> _Cluster:
+        cluster = _Cluster(fingerprint, article)
+        self._clusters[url] = cluster
+        for key in self._band_keys(fingerprint):
+            self._bands.setdefault(key, set()).add(url)
+        while len(self._clusters) > self.max_clusters:
+            self._evict(next(iter(self._clusters)))
+        return cluster
+
+    def _evict(self, url: str):
+        cluster = self._clusters.pop(url)
+        for key in self._band_keys(cluster.fingerprint):
+            members = self._bands.get(key)
+            if members is not None:
+                members.discard(url)
+                if not members:
+                    del self._bands[key]
+
+    def canonicalize(self, article: Article) -> Article:
+        """Get the canonical article for this story, registering it if new"""
+        url = article.url
+        self.stats["checked"] += 1
+        cluster = self._clusters.get(url)
+        if cluster is not None:
+            # Same article fetched again: keep the fresh copy, carry alternates over
+            if cluster.canonical.alternate_sources and not article.alternate_sources:
+                article = article_store.put(article.with_alternates(cluster.canonical.alternate_sources))
+            cluster.canonical = article
+            return article
+
+        fingerprint = simhash(_story_text(article))
+        if fingerprint is None:
+            # No title or description to compare, so nothing can be called a duplicate of it
+            return article
+        cluster = self._find(fingerprint)
+        if cluster is None:
+            return self._add(url, fingerprint, article).canonical
+
+        self.stats["collapsed"] += 1
+        canonical = cluster.canonical.with_alternate(article.source or "Unknown", url)
+        if canonical is not cluster.canonical:
+            cluster.canonical = article_store.put(canonical)
+        return canonical
+
+    def collapse(self, articles: Iterable[Article]) -> List[Article]:
+        """Replace near-duplicates with their canonical article, keeping first-seen order"""
+        result: Dict[str, Article] = {}
+        for article in articles:
+            canonical = self.canonicalize(article)
+            # A later duplicate may have produced a newer canonical copy; keep that one
+            result[canonical.url] = canonical
+        return list(result.values())
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats, clusters=len(self._clusters))
+
+duplicate_index = DuplicateIndex()
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict
+
+import discord
+
+from async_database import get_digest_groups
+from news_api import fetch_top_headlines
+from quota import background_lane
+from ratelimit import TokenBucket, discord_send_limiter
+from utils import create_digest_embed
+
+logger = logging.getLogger(__name__)
+
+DIGEST_HOUR_UTC = int(os.getenv("DIGEST_HOUR_UTC", "8"))
+DIGEST_ARTICLES = int(os.getenv("DIGEST_ARTICLES", "5"))
+DIGEST_CONCURRENCY = int(os.getenv("DIGEST_CONCURRENCY", "10"))
+DIGEST_MAX_RETRIES = 3
+
+class DigestEngine:
+    """Sends the daily digest to every subscriber.
+
+    Subscribers are grouped by (country, languages); each group's articles are
+    fetched once and its embed rendered once, then DMs go out through a
+    bounded worker pool behind the token bucket shared by all bulk Discord
+    senders; opening the DM channel and sending each take a token. discord.py already
+    honours per-route rate limits and 429 retry-after headers; transient
+    5xx/network failures are retried here with exponential backoff.
+    """
+
+    def __init__(self, bot: discord.Client, concurrency: int = DIGEST_CONCURRENCY,
+                 limiter: TokenBucket = discord_send_limiter):
+        self.bot = bot
+        self.concurrency = concurrency
+        self.limiter = limiter
+        self.last_run: Dict = {}
+
+    async def run(self) -> Dict:
+        start = time.perf_counter()
+        stats = {
+            "groups": 0,
+            "recipients": 0,
+            "delivered": 0,
+            "failed": 0,
+            "forbidden": 0,
+            "retries": 0,
+            "empty_groups": 0,
+            "skipped": 0,
+        }
+        groups = await get_digest_groups()
+        stats["groups"] = len(groups)
+
+        queue: "asyncio.Queue" = asyncio.Queue()
+        for country, languages, user_ids in groups:
+            with background_lane():
+                articles = await fetch_top_headlines(country=country, count=DIGEST_ARTICLES)
+            if not articles:
+                stats["empty_groups"] += 1
+                stats["skipped"] += len(user_ids)
+                logger.warning(f"No digest articles for {country}, skipping {len(user_ids)} users")
+                continue
+            embed = create_digest_embed(articles, country, list(languages))
+            for user_id in user_ids:
+                queue.put_nowait((user_id, embed))
+            stats["recipients"] += len(user_ids)
+
+        workers = [asyncio.create_task(self._worker(queue, stats)) for _ in range(self.concurrency)]
+        await queue.join()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+        duration = time.perf_counter() - start
+        stats["duration_s"] = round(duration, 2)
+        stats["throughput_per_s"] = round(stats["delivered"] / duration, 2) if duration else 0.0
+        self.last_run = stats
+        logger.warning(f"📬 Daily digest run: {stats}")
+        return stats
+
+    async def _worker(self, queue: "asyncio.Queue", stats: Dict):
+        while True:
+            user_id, embed = await queue.get()
+            try:
+                await self._deliver(user_id, embed, stats)
+            except Exception as e:
+                # One bad send must not kill the worker, or queue.join() never returns
+                logger.error(f"Unexpected error sending digest to {user_id}: {e}")
+                stats["failed"] += 1
+            finally:
+                queue.task_done()
+
+    async def _deliver(self, user_id: int, embed: discord.Embed, stats: Dict):
+        for attempt in range(DIGEST_MAX_RETRIES + 1):
+            await self.limiter.acquire()
+            try:
+                channel = await self.bot.create_dm(discord.Object(id=user_id))
+                await self.limiter.acquire()
+                await channel.send(embed=embed)
+                stats["delivered"] += 1
+                return
+            except (discord.Forbidden, discord.NotFound):
+                # DMs closed or user gone; retrying won't help
+                stats["forbidden"] += 1
+                stats["failed"] += 1
+                return
+            except (discord.HTTPException, OSError, asyncio.TimeoutError) as e:
+                status = getattr(e, "status", None)
+                retryable = status is None or status >= 500 or status == 429
+                if retryable and attempt < DIGEST_MAX_RETRIES:
+                    stats["retries"] += 1
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+                logger.error(f"Error sending digest to {user_id}: {e}")
+                break
+        stats["failed"] += 1
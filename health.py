@@ -0,0 +1,155 @@
+import hmac
+import logging
+import math
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+import discord
+from aiohttp import web
+
+import async_database
+from cache import TTLCache
+from loopwatch import loop_watchdog
+from metrics import REGISTRY
+from news_api import get_upstream_stats
+from quota import quota_manager
+from tracing import trace_collector
+
+logger = logging.getLogger(__name__)
+
+HEALTH_PORT = int(os.environ.get("PORT", 10000))
+HEALTH_CHECK_INTERVAL = 5  # seconds between checks per client
+HEALTH_LIMITER_SIZE = 4096  # Clients remembered by the rate limiter
+DB_CHECK_INTERVAL = 5  # Reuse a database ping result for this long
+MAX_LOOP_LAG = float(os.getenv("HEALTH_MAX_LOOP_LAG_SECONDS", "1.0"))
+# Bearer token for /debug/traces; without one it only answers on loopback
+DEBUG_TOKEN = os.getenv("DEBUG_TOKEN")
+LOOPBACK_ADDRESSES = ("127.0.0.1", "::1")
+
+class HealthServer:
+    """Liveness and readiness endpoints served on the bot's own event loop.
+
+    `/health` always answers 200 while the process is up and reports the
+    readiness checks, the worst event loop blockers and NewsAPI stats;
+    `/ready` answers 503 unless the gateway is connected, MongoDB answers a
+    ping and loop lag is below MAX_LOOP_LAG. Each client may hit `/health`
+    once per HEALTH_CHECK_INTERVAL; the limiter is an LRU of recent clients,
+    so its memory is bounded. `/ready` is not limited, since its checks are
+    cheap and the database ping result is cached.
+    """
+
+    def __init__(self, bot: discord.Client, host: str = "0.0.0.0", port: int = HEALTH_PORT):
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self.started_at = datetime.utcnow()
+        self._limiter = TTLCache(max_entries=HEALTH_LIMITER_SIZE, default_ttl=HEALTH_CHECK_INTERVAL)
+        self._db_ok = False
+        self._db_checked_at = 0.0
+        self._runner: Optional[web.AppRunner] = None
+
+        self.app = web.Application()
+        self.app.router.add_get("/", self.index)
+        self.app.router.add_get("/health", self.health)
+        self.app.router.add_get("/ready", self.ready)
+        self.app.router.add_get("/metrics", self.metrics)
+        self.app.router.add_get("/debug/traces", self.traces)
+
+    async def start(self):
+        loop_watchdog.start()
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"Health server listening on {self.host}:{self.port}")
+
+    async def stop(self):
+        loop_watchdog.stop()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _rate_limited(self, request: web.Request) -> bool:
+        key = (request.remote or "unknown", request.path)
+        if key in self._limiter:
+            return True
+        self._limiter.set(key, True)
+        return False
+
+    def _debug_allowed(self, request: web.Request) -> bool:
+        if DEBUG_TOKEN:
+            supplied = request.headers.get("Authorization", "")
+            return hmac.compare_digest(supplied.encode(), f"Bearer {DEBUG_TOKEN}".encode())
+        return request.remote in LOOPBACK_ADDRESSES
+
+    async def _database_ok(self) -> bool:
+        now = time.monotonic()
+        if now - self._db_checked_at >= DB_CHECK_INTERVAL:
+            self._db_checked_at = now
+            try:
+                await async_database.ping()
+                self._db_ok = True
+            except Exception as e:
+                logger.warning(f"Database ping failed: {e}")
+                self._db_ok = False
+        return self._db_ok
+
+    async def checks(self) -> Dict:
+        latency = self.bot.latency
+        return {
+            "gateway": {
+                "ok": self.bot.is_ready() and not self.bot.is_closed(),
+                "latency_ms": round(latency * 1000, 1) if math.isfinite(latency) else None,
+            },
+            "database": {"ok": await self._database_ok()},
+            "event_loop": {
+                "ok": loop_watchdog.lag < MAX_LOOP_LAG,
+                "lag_ms": round(loop_watchdog.lag * 1000, 1),
+                "max_lag_ms": round(loop_watchdog.max_lag * 1000, 1),
+                "stalls": loop_watchdog.stalls,
+            },
+        }
+
+    async def index(self, request: web.Request) -> web.Response:
+        return web.Response(text="Bot is running!")
+
+    async def health(self, request: web.Request) -> web.Response:
+        """Health check endpoint with rate limiting"""
+        if self._rate_limited(request):
+            return web.json_response({"status": "ok", "message": "Rate limited"}, status=429)
+        checks = await self.checks()
+        ready = all(check["ok"] for check in checks.values())
+        return web.json_response({
+            "status": "ok" if ready else "degraded",
+            "timestamp": datetime.utcnow().isoformat(),
+            "uptime": str(datetime.utcnow() - self.started_at),
+            "checks": checks,
+            "loop_blockers": loop_watchdog.report(),
+            "newsapi_quota": quota_manager.state(),
+            "newsapi_upstream": get_upstream_stats()
+        })
+
+    async def ready(self, request: web.Request) -> web.Response:
+        checks = await self.checks()
+        ready = all(check["ok"] for check in checks.values())
+        return web.json_response({"ready": ready, "checks": checks}, status=200 if ready else 503)
+
+    async def metrics(self, request: web.Request) -> web.Response:
+        """Prometheus text exposition of every registered metric"""
+        return web.Response(text=REGISTRY.render(), content_type="text/plain", charset="utf-8",
+                            headers={"X-Content-Type-Options": "nosniff"})
+
+    async def traces(self, request: web.Request) -> web.Response:
+        """Slowest recent interaction traces, e.g. /debug/traces?min_ms=1000&command=/news"""
+        if not self._debug_allowed(request):
+            return web.json_response({"error": "Forbidden"}, status=403)
+        try:
+            min_ms = float(request.query.get("min_ms", 0))
+            limit = min(int(request.query.get("limit", 20)), 100)
+        except ValueError:
+            return web.json_response({"error": "min_ms and limit must be numbers"}, status=400)
+        return web.json_response({
+            "recorded": trace_collector.recorded,
+            "traces": trace_collector.recent(min_ms, limit, request.query.get("command"))
+        })
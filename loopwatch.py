@@ -0,0 +1,183 @@
+import asyncio
+import inspect
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from types import CodeType, FrameType
+from typing import Dict, List, Optional, Tuple
+
+from discord import app_commands
+
+from metrics import CallbackMetric, Counter
+
+logger = logging.getLogger(__name__)
+
+STALL_THRESHOLD = float(os.getenv("LOOP_STALL_THRESHOLD_SECONDS", "0.25"))
+HEARTBEAT_INTERVAL = 0.05
+MAX_OFFENDERS = 100  # Distinct stall sources kept for reporting
+STACK_DEPTH = 12  # Frames kept per captured stack
+
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+loop_stalls = Counter("event_loop_stalls", "Event loop stalls over the threshold, by blocking source", ("source",))
+
+class _Offender:
+    __slots__ = ("count", "total", "worst", "stack")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+        self.stack: List[str] = []
+
+class LoopWatchdog:
+    """Detects event loop stalls and finds out what was blocking.
+
+    A heartbeat task on the loop records when it last ran. A separate
+    thread checks the heartbeat and, once it is more than `threshold`
+    seconds late, captures the loop thread's stack with
+    sys._current_frames(). The stack is attributed to the innermost
+    registered slash command or view callback (matched by code object),
+    falling back to the innermost frame from this project. When the loop
+    recovers, the stall is logged and added to the per-source totals.
+    """
+
+    def __init__(self, threshold: float = STALL_THRESHOLD, interval: float = HEARTBEAT_INTERVAL):
+        self.threshold = threshold
+        self.interval = interval
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._labels: Dict[CodeType, str] = {}
+        self._offenders: Dict[str, _Offender] = {}
+        self._beat = 0
+        self._beat_at = time.monotonic()
+        self._sample: Optional[Tuple[int, str, List[str]]] = None  # (beat, source, stack)
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def register(self, func, label: str):
+        """Attribute stalls inside `func` to `label`"""
+        func = inspect.unwrap(func)
+        code = getattr(func, "__code__", None)
+        if code is not None:
+            self._labels[code] = label
+
+    def register_tree(self, tree: app_commands.CommandTree):
+        for command in tree.walk_commands():
+            if isinstance(command, app_commands.Command):
+                self.register(command.callback, f"/{command.qualified_name}")
+                for check in command.checks:
+                    # Check predicates from one factory share a code object, so name the factory
+                    self.register(check, f"{check.__qualname__.split('.<locals>')[0]} check")
+
+    def register_view(self, view_cls: type):
+        for name, func in vars(view_cls).items():
+            if inspect.iscoroutinefunction(func):
+                self.register(func, f"{view_cls.__name__}.{name}")
+
+    def start(self):
+        """Start the heartbeat on the running loop and the watching thread"""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat_at = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _heartbeat(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lag = max(0.0, loop.time() - expected)
+            self.max_lag = max(self.max_lag, self.lag)
+            sample = self._sample
+            if self.lag >= self.threshold:
+                if sample is not None and sample[0] == self._beat:
+                    self._record(sample[1], sample[2])
+                else:
+                    # Recovered before the watching thread caught it
+                    self._record("unattributed", [])
+            self._beat += 1
+            self._beat_at = time.monotonic()
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval):
+            beat = self._beat
+            late = time.monotonic() - self._beat_at - self.interval
+            sample = self._sample
+            if late >= self.threshold and (sample is None or sample[0] != beat):
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is not None:
+                    source, stack = self._attribute(frame)
+                    self._sample = (beat, source, stack)
+
+    def _attribute(self, frame: FrameType) -> Tuple[str, List[str]]:
+        """Name the callback that owns this stack, innermost registered frame first"""
+        stack = traceback.extract_stack(frame)
+        source = None
+        fallback = None
+        current: Optional[FrameType] = frame
+        while current is not None:
+            code = current.f_code
+            if code in self._labels:
+                source = self._labels[code]
+                break
+            if fallback is None and code.co_filename.startswith(_PROJECT_DIR):
+                fallback = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+            current = current.f_back
+        source = source or fallback or f"{os.path.basename(stack[-1].filename)}:{stack[-1].name}"
+        return source, [line.rstrip() for line in traceback.format_list(stack[-STACK_DEPTH:])]
+
+    def _record(self, source: str, stack: List[str]):
+        self.stalls += 1
+        offender = self._offenders.get(source)
+        if offender is None:
+            if len(self._offenders) >= MAX_OFFENDERS:
+                source = "other"
+                offender = self._offenders.setdefault(source, _Offender())
+            else:
+                offender = self._offenders[source] = _Offender()
+        offender.count += 1
+        offender.total += self.lag
+        if self.lag >= offender.worst:
+            offender.worst = self.lag
+            offender.stack = stack
+        loop_stalls.labels(source).inc()
+        logger.warning(
+            f"Event loop blocked for {self.lag * 1000:.0f}ms by {source}"
+            + ("\n" + "\n".join(stack) if stack else "")
+        )
+
+    def report(self, limit: int = 5) -> List[Dict]:
+        """Stall sources with the most total blocked time"""
+        worst = sorted(self._offenders.items(), key=lambda item: item[1].total, reverse=True)[:limit]
+        return [
+            {
+                "source": source,
+                "stalls": offender.count,
+                "total_ms": round(offender.total * 1000, 1),
+                "worst_ms": round(offender.worst * 1000, 1),
+                "worst_stack": offender.stack[-4:],
+            }
+            for source, offender in worst
+        ]
+
+loop_watchdog = LoopWatchdog()
+
+CallbackMetric("event_loop_lag_seconds", "Latest event loop lag measured by the heartbeat", "gauge",
+               lambda: loop_watchdog.lag)
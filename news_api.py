@@ -1,11 +1,25 @@
 import os
-import requests
+import asyncio
+import hashlib
+import aiohttp
 import logging
-from typing import List, Dict, Optional
+import random
+import time
+from typing import Callable, List, Dict, Optional, Tuple
+from collections import Counter
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
+from datetime import timedelta, timezone
 import json
-from database import cache_news_article, get_cached_article, clear_expired_cache
+from articles import Article, ArticleFeed, article_store
+from cache import TTLCache
+from metrics import CallbackMetric, newsapi_latency, newsapi_responses
+from async_database import clear_expired_cache, get_recent_cached_articles
+from persistence import article_writer
+from quota import INTERACTIVE, QuotaExhausted, quota_manager, background_lane, current_lane
+from resilience import HALF_OPEN, CircuitBreaker, CircuitOpenError
+from search_index import article_index, tokenize
+from dedup import duplicate_index
+from tracing import annotate, detached, span
 import traceback
 
 # Configure logging
@@ -24,208 +38,499 @@ if not NEWS_API_KEY:
 else:
     logger.info("NewsAPI key found in environment variables.")
 
-# Cache for storing API responses
+NEWS_API_BASE_URL = os.getenv("NEWS_API_BASE_URL", "https://newsapi.org").rstrip("/")
+
+# Shared HTTP client settings
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=10)
+HTTP_POOL_SIZE = int(os.getenv("NEWS_API_POOL_SIZE", "20"))  # Total open connections
+HTTP_PER_HOST_LIMIT = int(os.getenv("NEWS_API_PER_HOST_LIMIT", "8"))  # Concurrent requests per host
+HTTP_KEEPALIVE = 30  # Seconds to keep idle connections open
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+_http_session: Optional[aiohttp.ClientSession] = None
+
+# Upstream resilience: retries, hedged requests and a circuit breaker
+RETRY_ATTEMPTS = int(os.getenv("NEWS_API_RETRIES", "2"))  # Extra attempts after the first
+RETRY_BASE_DELAY = float(os.getenv("NEWS_API_RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY = 5.0
+HEDGE_DELAY = float(os.getenv("NEWS_API_HEDGE_DELAY", "2.0"))  # 0 disables hedging
+news_api_breaker = CircuitBreaker(
+    "newsapi",
+    failure_threshold=int(os.getenv("NEWS_API_BREAKER_THRESHOLD", "5")),
+    reset_timeout=float(os.getenv("NEWS_API_BREAKER_RESET_SECONDS", "30"))
+)
+upstream_stats = {"retries": 0, "hedged": 0, "hedge_wins": 0}
+
+# Cache for storing API responses; entries are ArticleFeeds of shared Article objects
 CACHE_DURATION = timedelta(minutes=15)  # Cache for 15 minutes
-api_cache = {}
+API_CACHE_MAX_ENTRIES = int(os.getenv("API_CACHE_MAX_ENTRIES", "512"))
+API_CACHE_MAX_BYTES = int(os.getenv("API_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # ~64 MB
+api_cache = TTLCache(
+    max_entries=API_CACHE_MAX_ENTRIES,
+    max_bytes=API_CACHE_MAX_BYTES,
+    default_ttl=CACHE_DURATION.total_seconds()
+)
+
+CallbackMetric(
+    "api_cache_lookups", "API cache lookups by result", "counter",
+    lambda: {("hit",): api_cache.hits, ("stale_hit",): api_cache.stale_hits, ("miss",): api_cache.misses},
+    ("result",)
+)
+CallbackMetric(
+    "api_cache_removals", "API cache entries removed, by reason", "counter",
+    lambda: {("evicted",): api_cache.evictions, ("expired",): api_cache.expirations},
+    ("reason",)
+)
+CallbackMetric("api_cache_entries", "Feeds currently held in the API cache", "gauge", lambda: len(api_cache))
+
+# Stale-while-revalidate: serve expired feeds for up to MAX_STALENESS past
+# CACHE_DURATION while one background refresh runs; older entries are refetched inline
+STALE_WHILE_REVALIDATE = os.getenv("STALE_WHILE_REVALIDATE", "1") != "0"
+MAX_STALENESS = timedelta(minutes=int(os.getenv("CACHE_MAX_STALENESS_MINUTES", "45")))
 
-def get_cached_data(cache_key: str) -> Optional[Dict]:
+# Upstream fetches currently in flight, keyed by cache key (single-flight)
+_inflight: Dict[str, "asyncio.Future[ArticleFeed]"] = {}
+# Quota lane each in-flight fetch charges its NewsAPI calls to; interactive joiners raise it
+_inflight_lanes: Dict[str, str] = {}
+fetch_stats = {
+    "upstream_calls": 0,
+    "coalesced_calls": 0,
+    "stale_served": 0,
+    "background_refreshes": 0,
+    "quota_fallbacks": 0,
+    "index_answers": 0,
+}
+CallbackMetric(
+    "newsapi_fetches", "Feed fetches by how they were served", "counter",
+    lambda: {
+        ("upstream",): fetch_stats["upstream_calls"],
+        ("coalesced",): fetch_stats["coalesced_calls"],
+        ("stale",): fetch_stats["stale_served"],
+        ("index",): fetch_stats["index_answers"],
+    },
+    ("result",)
+)
+CallbackMetric("newsapi_background_refreshes", "Stale feeds refreshed in the background", "counter",
+               lambda: fetch_stats["background_refreshes"])
+CallbackMetric("newsapi_quota_fallbacks", "Upstream fetches answered from cache for lack of quota or an open circuit",
+               "counter", lambda: fetch_stats["quota_fallbacks"])
+CallbackMetric("newsapi_fetches_in_flight", "Upstream feed fetches currently running", "gauge",
+               lambda: len(_inflight))
+
+# Recent demand per (country, category) feed, consumed by the cache warmer
+MAX_TRACKED_FEEDS = 1000
+feed_demand: "Counter[Tuple[str, Optional[str]]]" = Counter()
+
+def get_cached_data(cache_key: str) -> Optional[ArticleFeed]:
     """Get data from cache if it exists and is not expired"""
-    if cache_key in api_cache:
-        timestamp, data = api_cache[cache_key]
-        if datetime.now() - timestamp < CACHE_DURATION:
-            logger.info(f"Using cached data for {cache_key}")
-            return data
-    return None
+    data = api_cache.get(cache_key)
+    if data is not None:
+        logger.info(f"Using cached data for {cache_key}")
+    return data
 
-def set_cache_data(cache_key: str, data: Dict):
+def set_cache_data(cache_key: str, data: ArticleFeed):
     """Store data in cache with current timestamp"""
-    api_cache[cache_key] = (datetime.now(), data)
-    # Also cache individual articles in database
-    if isinstance(data, list):
-        for article in data:
-            if "url" in article:
-                cache_news_article(article["url"], article)
-
-def make_api_request(url: str, params: Dict = None) -> Optional[Dict]:
-    """Make API request with error handling and retries"""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
+    api_cache.set(cache_key, data, stale_ttl=MAX_STALENESS.total_seconds())
+    article_index.add_many(data)
+    # Also cache individual articles in database, in bulk and off the event loop
+    article_writer.submit(data)
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Get the shared keep-alive HTTP session, creating it on first use"""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_SIZE,
+            limit_per_host=HTTP_PER_HOST_LIMIT,
+            keepalive_timeout=HTTP_KEEPALIVE,
+            ttl_dns_cache=300
+        )
+        _http_session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=HTTP_TIMEOUT,
+            headers=HTTP_HEADERS
+        )
+    return _http_session
+
+async def close_http_session():
+    """Close the shared HTTP session and its connection pool"""
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
+
+class _TransientError(Exception):
+    """A network error, timeout or 5xx reply that is worth retrying"""
+
+async def _send_request(url: str, params: Optional[Dict]) -> Optional[Dict]:
+    """Send one GET; returns None for non-retryable client errors"""
+    session = get_http_session()
+    endpoint = url.rsplit("/", 1)[-1]
+    status = "error"
+    start = time.perf_counter()
+    with span("newsapi.request", endpoint=endpoint) as request_span:
+        try:
+            async with session.get(url, params=params) as response:
+                status = str(response.status)
+                if response.status >= 400:
+                    try:
+                        body = await response.json(content_type=None)
+                    except ValueError:
+                        body = None
+                    if response.status == 429 or (isinstance(body, dict) and body.get("code") == "rateLimited"):
+                        retry_after = response.headers.get("Retry-After")
+                        quota_manager.record_rate_limited(float(retry_after) if retry_after and retry_after.isdigit() else None)
+                        raise QuotaExhausted("NewsAPI rate limit reached")
+                    if response.status >= 500:
+                        raise _TransientError(f"HTTP {response.status}")
+                    message = body.get("message") if isinstance(body, dict) else None
+                    logger.error(f"API request failed: HTTP {response.status} {message or ''}")
+                    return None
+                data = await response.json()
+                quota_manager.record_success()
+                return data
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            if isinstance(e, asyncio.TimeoutError):
+                status = "timeout"
+            raise _TransientError(repr(e)) from e
+        except asyncio.CancelledError:
+            # Usually the losing copy of a hedged request
+            status = "cancelled"
+            raise
+        finally:
+            newsapi_latency.labels(endpoint).observe(time.perf_counter() - start)
+            newsapi_responses.labels(endpoint, status).inc()
+            if request_span is not None:
+                request_span.attrs["status"] = status
+
+async def _hedged_request(url: str, params: Optional[Dict]) -> Optional[Dict]:
+    """Send a request, racing a second copy against it if the first is slow"""
+    first = asyncio.ensure_future(_send_request(url, params))
+    if HEDGE_DELAY <= 0:
+        return await first
+    done, _ = await asyncio.wait({first}, timeout=HEDGE_DELAY)
+    if done or not quota_manager.try_acquire():
+        return await first
+
+    upstream_stats["hedged"] += 1
+    second = asyncio.ensure_future(_send_request(url, params))
+    pending = {first, second}
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try:
+                    result = task.result()
+                except _TransientError as e:
+                    error = e
+                    continue
+                if task is second:
+                    upstream_stats["hedge_wins"] += 1
+                return result
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def make_api_request(url: str, params: Dict = None,
+                           lane: Optional[Callable[[], str]] = None) -> Optional[Dict]:
+    """Make API request with error handling and retries.
+
+    Transient failures are retried with jittered exponential backoff, slow
+    responses are hedged with a second request, and repeated failures open a
+    circuit breaker. Raises QuotaExhausted when the current lane has no
+    NewsAPI budget left (or NewsAPI reports we are rate limited) and
+    CircuitOpenError while the breaker is open, so callers can fall back to cache.
+    `lane`, if given, is read before every attempt to pick the quota lane,
+    so a running fetch can be promoted; otherwise the task's lane is used.
+    """
+    if not news_api_breaker.allow():
+        raise CircuitOpenError("NewsAPI circuit is open")
+    # A half-open probe that ends without an outcome (no quota, cancelled) must be handed back,
+    # or the breaker would turn every later call away
+    probing = news_api_breaker.state == HALF_OPEN
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        logger.error(f"API request failed: {e}")
+        for attempt in range(RETRY_ATTEMPTS + 1):
+            attempt_lane = lane() if lane else current_lane()
+            if not quota_manager.try_acquire(attempt_lane):
+                raise QuotaExhausted(f"No NewsAPI budget left for {attempt_lane} requests")
+            try:
+                data = await _hedged_request(url, params)
+                news_api_breaker.record_success()
+                return data
+            except QuotaExhausted:
+                # A rate-limit reply still means NewsAPI is up
+                news_api_breaker.record_success()
+                raise
+            except _TransientError as e:
+                news_api_breaker.record_failure()
+                if attempt == RETRY_ATTEMPTS or not news_api_breaker.allow():
+                    logger.error(f"API request failed: {e}")
+                    return None
+                upstream_stats["retries"] += 1
+                delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+                logger.warning(f"API request failed ({e}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
         return None
+    finally:
+        if probing:
+            news_api_breaker.release_probe()
+
+def get_upstream_stats() -> Dict:
+    """Get retry/hedging counters and circuit breaker state"""
+    return dict(upstream_stats, circuit=news_api_breaker.stats())
+
+async def _request_articles(cache_key: str, url: str, params: Dict, label: str,
+                            transform: Optional[Callable[[List[Article]], List[Article]]] = None) -> ArticleFeed:
+    """Call NewsAPI once and cache the resulting article list"""
+    # Runs in its own task, so the span lands under whichever caller started the fetch
+    with span("upstream", key=_trace_key(cache_key), lane=current_lane()):
+        try:
+            logger.info(f"Fetching {label}")
+            started_lane = current_lane()
+            data = await make_api_request(url, params, lambda: _inflight_lanes.get(cache_key, started_lane))
+
+            if data and data.get("status") == "ok":
+                articles = article_store.intern_many(data.get("articles", []))
+                logger.info(f"Found {len(articles)} articles for {label}")
+                annotate(articles=len(articles))
+                articles = duplicate_index.collapse(articles)
+                if transform:
+                    articles = transform(articles)
+                articles = ArticleFeed(articles)
+
+                # Cache the results
+                set_cache_data(cache_key, articles)
+                return articles
+            else:
+                error_msg = data.get('message', 'Unknown error') if data else 'No response'
+                logger.error(f"NewsAPI error: {error_msg}")
+                return ArticleFeed()
+        except (QuotaExhausted, CircuitOpenError) as e:
+            # Out of budget or upstream down: serve whatever we still hold for this key, however stale
+            logger.warning(f"{e}; serving cached {label}")
+            annotate(fallback=type(e).__name__)
+            fetch_stats["quota_fallbacks"] += 1
+            cached = api_cache.get_with_staleness(cache_key)
+            return cached[0] if cached else ArticleFeed()
+        except Exception as e:
+            logger.error(f"Error fetching {label}: {str(e)}\n{traceback.format_exc()}")
+            return ArticleFeed()
+
+def _start_fetch(cache_key: str, url: str, params: Dict, label: str,
+                 transform: Optional[Callable[[List[Article]], List[Article]]] = None) -> "asyncio.Future[ArticleFeed]":
+    """Get the in-flight fetch for a cache key, starting one if there is none"""
+    task = _inflight.get(cache_key)
+    if task is None:
+        task = asyncio.ensure_future(_request_articles(cache_key, url, params, label, transform))
+        _inflight[cache_key] = task
+        _inflight_lanes[cache_key] = current_lane()
+        task.add_done_callback(lambda t: _clear_inflight(cache_key, t))
+        fetch_stats["upstream_calls"] += 1
+    else:
+        fetch_stats["coalesced_calls"] += 1
+        logger.info(f"Joining in-flight request for {cache_key}")
+        if current_lane() == INTERACTIVE and _inflight_lanes.get(cache_key) != INTERACTIVE:
+            # A user is now waiting on this fetch, so it may spend interactive budget
+            _inflight_lanes[cache_key] = INTERACTIVE
+            logger.info(f"Promoted in-flight request for {cache_key} to the interactive lane")
+    return task
+
+def _clear_inflight(cache_key: str, task: "asyncio.Future[ArticleFeed]"):
+    if _inflight.get(cache_key) is task:
+        del _inflight[cache_key]
+        _inflight_lanes.pop(cache_key, None)
+
+async def _fetch_articles(cache_key: str, url: str, params: Dict, label: str,
+                          transform: Optional[Callable[[List[Article]], List[Article]]] = None,
+                          stale_ok: bool = False, refresh: bool = False) -> ArticleFeed:
+    """Get articles for a cache key, coalescing concurrent misses into one upstream call.
+
+    With `stale_ok`, an expired entry still inside MAX_STALENESS is returned
+    right away and a single background refresh is scheduled for its key.
+    With `refresh`, the cache is skipped and the key is always refetched.
+    """
+    if not refresh and stale_ok and STALE_WHILE_REVALIDATE:
+        cached = api_cache.get_with_staleness(cache_key)
+        if cached and cached[0]:
+            data, is_stale = cached
+            annotate(cache="stale" if is_stale else "hit")
+            if is_stale:
+                fetch_stats["stale_served"] += 1
+                if cache_key not in _inflight:
+                    fetch_stats["background_refreshes"] += 1
+                    logger.info(f"Serving stale data for {cache_key}, refreshing in background")
+                    annotate(background_refresh=True)
+                    # Nobody waits on the refresh, so keep it out of this caller's trace
+                    with background_lane(), detached():
+                        _start_fetch(cache_key, url, params, label, transform)
+            return data
+    elif not refresh:
+        cached_data = get_cached_data(cache_key)
+        if cached_data:
+            annotate(cache="hit")
+            return cached_data
+
+    annotate(cache="refresh" if refresh else "coalesced" if cache_key in _inflight else "miss")
+    task = _start_fetch(cache_key, url, params, label, transform)
+    # Shield the shared fetch so one cancelled caller doesn't cancel it for everyone
+    return await asyncio.shield(task)
 
-def fetch_top_headlines(country: str = "us", count: int = 5, breaking: bool = False) -> List[Dict]:
-    """Fetch top headlines from NewsAPI"""
+def get_fetch_stats() -> Dict[str, int]:
+    """Get upstream vs. coalesced call counters"""
+    return dict(fetch_stats, in_flight=len(_inflight))
+
+def _record_demand(country: str, category: Optional[str] = None):
+    feed = (country, category)
+    if feed in feed_demand or len(feed_demand) < MAX_TRACKED_FEEDS:
+        feed_demand[feed] += 1
+
+def headlines_cache_key(country: str, breaking: bool = False) -> str:
+    return f"headlines_{country}_{breaking}"
+
+def _trace_key(cache_key: str) -> str:
+    """Cache key safe to expose in traces: user search text is replaced by a short hash"""
+    if cache_key.startswith("query_"):
+        return "query_" + hashlib.blake2b(cache_key.encode(), digest_size=6).hexdigest()
+    return cache_key
+
+def category_cache_key(category: str, country: Optional[str] = None) -> str:
+    if country:
+        return f"category_{country}_{category.lower()}"
+    return f"category_{category.lower()}"
+
+def _filter_breaking(articles: List[Article]) -> List[Article]:
+    """Keep breaking news articles, falling back to the most recent one"""
+    breaking_articles = [a for a in articles if 'breaking' in ((a.title or '') + (a.description or '')).lower()]
+    if breaking_articles:
+        logger.info(f"Found {len(breaking_articles)} breaking news articles")
+        return breaking_articles
+    # If no breaking news, get the most recent article
+    logger.info("No breaking news found, using most recent article")
+    return articles[:1]
+
+async def fetch_top_headlines(country: str = "us", count: int = 5, breaking: bool = False,
+                              refresh: bool = False) -> ArticleFeed:
+    """Fetch top headlines from NewsAPI.
+
+    `refresh` bypasses the cache and is not counted as user demand; the cache
+    warmer uses it to renew keys before they expire.
+    """
     if not NEWS_API_KEY:
         logger.error("NewsAPI key is missing")
-        return []
-    
-    cache_key = f"headlines_{country}_{breaking}"
-    cached_data = get_cached_data(cache_key)
-    if cached_data:
-        return cached_data[:count]
-    
-    try:
-        url = "https://newsapi.org/v2/top-headlines"
-        params = {
-            "country": country,
-            "apiKey": NEWS_API_KEY
-        }
-        
-        logger.info(f"Fetching headlines for country: {country}")
-        data = make_api_request(url, params)
-        
-        if data and data.get("status") == "ok":
-            articles = data.get("articles", [])
-            logger.info(f"Found {len(articles)} articles")
-            
-            if breaking:
-                # Filter for breaking news
-                breaking_articles = [a for a in articles if 'breaking' in (a.get('title','') + a.get('description','')).lower()]
-                if breaking_articles:
-                    articles = breaking_articles
-                    logger.info(f"Found {len(articles)} breaking news articles")
-                else:
-                    # If no breaking news, get the most recent article
-                    articles = articles[:1]
-                    logger.info("No breaking news found, using most recent article")
-            
-            # Cache the results
-            set_cache_data(cache_key, articles)
-            return articles[:count]
-        else:
-            error_msg = data.get('message', 'Unknown error') if data else 'No response'
-            logger.error(f"NewsAPI error: {error_msg}")
-            return []
-    except Exception as e:
-        logger.error(f"Error fetching headlines: {str(e)}\n{traceback.format_exc()}")
-        return []
+        return ArticleFeed()
+    if not refresh and not breaking:
+        _record_demand(country)
+
+    params = {
+        "country": country,
+        "apiKey": NEWS_API_KEY
+    }
+    articles = await _fetch_articles(
+        headlines_cache_key(country, breaking),
+        f"{NEWS_API_BASE_URL}/v2/top-headlines",
+        params,
+        f"headlines for country {country}",
+        transform=_filter_breaking if breaking else None,
+        stale_ok=True,
+        refresh=refresh
+    )
+    return articles.head(count)
 
-def fetch_news_by_category(category: str, count: int = 5) -> List[Dict]:
-    """Fetch news by category from NewsAPI"""
+async def fetch_news_by_category(category: str, count: int = 5, country: Optional[str] = None,
+                                 refresh: bool = False) -> ArticleFeed:
+    """Fetch news by category from NewsAPI, optionally limited to one country"""
     if not NEWS_API_KEY:
         logger.error("NewsAPI key is missing")
-        return []
-    
-    cache_key = f"category_{category}"
-    cached_data = get_cached_data(cache_key)
-    if cached_data:
-        return cached_data[:count]
-    
-    try:
-        url = "https://newsapi.org/v2/top-headlines"
-        params = {
-            "category": category.lower(),
-            "apiKey": NEWS_API_KEY
-        }
-        
-        logger.info(f"Fetching news for category: {category}")
-        data = make_api_request(url, params)
-        
-        if data and data.get("status") == "ok":
-            articles = data.get("articles", [])
-            logger.info(f"Found {len(articles)} articles for category {category}")
-            
-            # Cache the results
-            set_cache_data(cache_key, articles)
-            return articles[:count]
-        else:
-            error_msg = data.get('message', 'Unknown error') if data else 'No response'
-            logger.error(f"NewsAPI error: {error_msg}")
-            return []
-    except Exception as e:
-        logger.error(f"Error fetching category news: {e}")
-        return []
+        return ArticleFeed()
+    if not refresh:
+        _record_demand(country, category.lower())
 
-def fetch_news_by_query(query: str, count: int = 5) -> List[Dict]:
+    params = {
+        "category": category.lower(),
+        "apiKey": NEWS_API_KEY
+    }
+    if country:
+        params["country"] = country
+    articles = await _fetch_articles(
+        category_cache_key(category, country),
+        f"{NEWS_API_BASE_URL}/v2/top-headlines",
+        params,
+        f"category {category}" + (f" in {country}" if country else ""),
+        stale_ok=True,
+        refresh=refresh
+    )
+    return articles.head(count)
+
+async def fetch_news_by_query(query: str, count: int = 5) -> ArticleFeed:
     """Fetch news by query from NewsAPI"""
     if not NEWS_API_KEY:
         logger.error("NewsAPI key is missing")
-        return []
-    
+        return ArticleFeed()
+
+    # Answer from articles we already hold when there are enough recent matches
     cache_key = f"query_{query}"
-    cached_data = get_cached_data(cache_key)
-    if cached_data:
-        return cached_data[:count]
-    
-    try:
-        url = "https://newsapi.org/v2/everything"
-        params = {
-            "q": query,
-            "sortBy": "relevancy",
-            "apiKey": NEWS_API_KEY
-        }
-        
-        logger.info(f"Fetching news for query: {query}")
-        data = make_api_request(url, params)
-        
-        if data and data.get("status") == "ok":
-            articles = data.get("articles", [])
-            logger.info(f"Found {len(articles)} articles for query {query}")
-            
-            # Cache the results
-            set_cache_data(cache_key, articles)
-            return articles[:count]
-        else:
-            error_msg = data.get('message', 'Unknown error') if data else 'No response'
-            logger.error(f"NewsAPI error: {error_msg}")
-            return []
-    except Exception as e:
-        logger.error(f"Error fetching query news: {e}")
-        return []
+    if cache_key not in api_cache and tokenize(query):
+        matches = article_index.search(query, limit=count)
+        if len(matches) >= count:
+            fetch_stats["index_answers"] += 1
+            logger.info(f"Answered query {query} from the local index")
+            annotate(cache="index")
+            return ArticleFeed(matches)
+
+    params = {
+        "q": query,
+        "sortBy": "relevancy",
+        "apiKey": NEWS_API_KEY
+    }
+    articles = await _fetch_articles(
+        cache_key,
+        f"{NEWS_API_BASE_URL}/v2/everything",
+        params,
+        f"query {query}"
+    )
+    return articles.head(count)
 
-def fetch_trending_news(count: int = 5) -> List[Dict]:
+async def fetch_trending_news(count: int = 5) -> ArticleFeed:
     """Fetch trending news from NewsAPI"""
     if not NEWS_API_KEY:
         logger.error("NewsAPI key is missing")
-        return []
-    
-    cache_key = "trending"
-    cached_data = get_cached_data(cache_key)
-    if cached_data:
-        return cached_data[:count]
-    
-    try:
-        url = "https://newsapi.org/v2/top-headlines"
-        params = {
-            "apiKey": NEWS_API_KEY
-        }
-        
-        logger.info("Fetching trending news")
-        data = make_api_request(url, params)
-        
-        if data and data.get("status") == "ok":
-            articles = data.get("articles", [])
-            logger.info(f"Found {len(articles)} trending articles")
-            
-            # Cache the results
-            set_cache_data(cache_key, articles)
-            return articles[:count]
-        else:
-            error_msg = data.get('message', 'Unknown error') if data else 'No response'
-            logger.error(f"NewsAPI error: {error_msg}")
-            return []
-    except Exception as e:
-        logger.error(f"Error fetching trending news: {e}")
-        return []
+        return ArticleFeed()
+
+    params = {
+        "apiKey": NEWS_API_KEY
+    }
+    articles = await _fetch_articles(
+        "trending",
+        f"{NEWS_API_BASE_URL}/v2/top-headlines",
+        params,
+        "trending news",
+        stale_ok=True
+    )
+    return articles.head(count)
+
+async def load_search_index() -> int:
+    """Seed the search index from articles still valid in the Mongo news_cache"""
+    rows = await get_recent_cached_articles(article_index.max_docs)
+    # Oldest first, so the index evicts in the right order
+    for data, cached_at in reversed(rows):
+        article = article_store.intern(data)
+        if article is not None:
+            article_index.add(article, ingested_at=cached_at.replace(tzinfo=timezone.utc).timestamp())
+    logger.info(f"Search index loaded with {len(rows)} cached articles")
+    return len(rows)
 
-def clear_cache():
+async def clear_cache():
     """Clear expired cache entries"""
     try:
         # Clear in-memory cache
-        now = datetime.now()
-        expired_keys = [k for k, (t, _) in api_cache.items() if now - t >= CACHE_DURATION]
-        for k in expired_keys:
-            del api_cache[k]
+        api_cache.purge_expired()
+        article_index.prune()
         
         # Clear database cache
-        clear_expired_cache()
+        await clear_expired_cache()
         
         logger.info("Cache cleared successfully")
     except Exception as e:
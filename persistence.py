@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+from articles import Article
+from async_database import cache_news_articles
+from metrics import CallbackMetric
+
+logger = logging.getLogger(__name__)
+
+WRITER_QUEUE_SIZE = int(os.getenv("ARTICLE_WRITER_QUEUE_SIZE", "256"))  # Pending responses
+WRITER_BATCH_SIZE = int(os.getenv("ARTICLE_WRITER_BATCH_SIZE", "500"))  # Articles per bulk write
+WRITER_LINGER = float(os.getenv("ARTICLE_WRITER_LINGER_SECONDS", "1.0"))  # Wait to fill a batch
+
+class ArticleWriter:
+    """Background writer that persists fetched articles to news_cache in bulk.
+
+    Responses are queued without blocking the caller; the worker merges them
+    into batches (deduplicated by URL), converts them to NewsAPI-shaped
+    documents and writes each batch with one unordered bulk upsert on the
+    Mongo executor. When the queue is full new responses are dropped and
+    counted, since news_cache is only a cache.
+    """
+
+    def __init__(self, max_queue: int = WRITER_QUEUE_SIZE, batch_size: int = WRITER_BATCH_SIZE,
+                 linger: float = WRITER_LINGER):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.linger = linger
+        self._queue: Optional["asyncio.Queue[List[Article]]"] = None
+        self._worker: Optional["asyncio.Task[None]"] = None
+        self.stats = {
+            "submitted": 0,
+            "dropped": 0,
+            "batches": 0,
+            "articles_written": 0,
+            "failures": 0,
+            "max_queue_depth": 0,
+            "last_batch_ms": 0.0,
+        }
+
+    def _ensure_worker(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    def submit(self, articles: Iterable[Article]) -> bool:
+        """Queue articles for persistence; returns False if they were dropped"""
+        articles = list(articles)
+        if not articles:
+            return True
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(articles)
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            logger.warning("Article writer queue full, dropping %d articles", len(articles))
+            return False
+        self.stats["submitted"] += 1
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self._queue.qsize())
+        return True
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def get_stats(self) -> Dict:
+        return dict(self.stats, queue_depth=self.queue_depth(), queue_capacity=self.max_queue)
+
+    async def _next_batch(self) -> List[List[Article]]:
+        """Wait for queued responses and collect them until the batch is full"""
+        responses = [await self._queue.get()]
+        size = len(responses[0])
+        deadline = time.monotonic() + self.linger
+        while size < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                articles = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            responses.append(articles)
+            size += len(articles)
+        return responses
+
+    async def _run(self):
+        while True:
+            responses = await self._next_batch()
+            # Later responses win when the same URL was fetched more than once
+            batch = [a.to_dict() for a in {a.url: a for articles in responses for a in articles}.values()]
+            try:
+                await self._write(batch)
+            finally:
+                for _ in responses:
+                    self._queue.task_done()
+
+    async def _write(self, batch: List[Dict]):
+        start = time.perf_counter()
+        try:
+            await cache_news_articles(batch)
+            self.stats["batches"] += 1
+            self.stats["articles_written"] += len(batch)
+        except Exception as e:
+            self.stats["failures"] += 1
+            logger.error(f"Error bulk caching {len(batch)} news articles: {e}")
+        self.stats["last_batch_ms"] = (time.perf_counter() - start) * 1000
+
+    async def stop(self, timeout: float = 10.0):
+        """Flush everything still queued and stop the worker"""
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Article writer stopped with %d responses unwritten", self.queue_depth())
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+article_writer = ArticleWriter()
+
+CallbackMetric("article_writer_queue_depth", "Fetched responses waiting to be written to news_cache", "gauge",
+               article_writer.queue_depth)
+CallbackMetric(
+    "article_writer_responses", "Fetched responses offered to the article writer, by outcome", "counter",
+    lambda: {("queued",): article_writer.stats["submitted"], ("dropped",): article_writer.stats["dropped"]},
+    ("outcome",)
+)
+CallbackMetric(
+    "article_writer_batches", "Bulk writes to news_cache, by result", "counter",
+    lambda: {("ok",): article_writer.stats["batches"], ("error",): article_writer.stats["failures"]},
+    ("result",)
+)
+CallbackMetric("article_writer_articles", "Articles written to news_cache", "counter",
+               lambda: article_writer.stats["articles_written"])
+CallbackMetric("article_writer_last_batch_seconds", "Duration of the latest bulk write", "gauge",
+               lambda: article_writer.stats["last_batch_ms"] / 1000)
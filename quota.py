@@ -0,0 +1,124 @@
+import contextvars
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+NEWS_API_DAILY_QUOTA = int(os.getenv("NEWS_API_DAILY_QUOTA", "100"))  # Developer plan limit
+NEWS_API_BURST = int(os.getenv("NEWS_API_BURST", "20"))
+# Background work (warmer, digests, broadcasts) may not dip into this share of the bucket
+BACKGROUND_RESERVE = float(os.getenv("NEWS_API_BACKGROUND_RESERVE", "0.5"))
+BACKOFF_BASE = 60.0
+BACKOFF_MAX = 3600.0
+
+# Lane for upstream calls made from the current task; background jobs switch it
+_current_lane: contextvars.ContextVar[str] = contextvars.ContextVar("newsapi_lane", default=INTERACTIVE)
+
+class QuotaMeter:
+    """Upstream requests granted and denied inside a `metered()` block"""
+
+    def __init__(self):
+        self.granted = 0
+        self.denied = 0
+
+# Meter charged by upstream calls from the current task and the fetch tasks it starts
+_current_meter: contextvars.ContextVar[Optional[QuotaMeter]] = contextvars.ContextVar("newsapi_meter", default=None)
+
+class QuotaExhausted(Exception):
+    """Raised instead of calling NewsAPI when the lane has no budget left"""
+
+@contextmanager
+def background_lane():
+    """Mark upstream calls made inside this block (and tasks it starts) as background"""
+    token = _current_lane.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+def current_lane() -> str:
+    return _current_lane.get()
+
+@contextmanager
+def metered() -> Iterator[QuotaMeter]:
+    """Count the NewsAPI requests (retries and hedges included) made inside this block.
+
+    Fetches joined from another caller are not counted, since this block
+    spent nothing on them.
+    """
+    meter = QuotaMeter()
+    token = _current_meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _current_meter.reset(token)
+
+class QuotaManager:
+    """Spreads the daily NewsAPI allowance across priority lanes.
+
+    One token bucket refills at daily_quota / 24h. Interactive calls may use
+    every token; background calls leave `background_reserve` of the bucket
+    untouched so commands keep working when warmers and digests are busy.
+    A 429 / `rateLimited` reply pauses all lanes with exponential backoff.
+    """
+
+    def __init__(self, daily_quota: int = NEWS_API_DAILY_QUOTA, burst: int = NEWS_API_BURST,
+                 background_reserve: float = BACKGROUND_RESERVE):
+        self.daily_quota = daily_quota
+        self.bucket = TokenBucket(rate=daily_quota / 86400, capacity=burst)
+        self.background_reserve = background_reserve
+        self.backoff_until = 0.0
+        self._backoff = 0.0
+        self.stats: Dict[str, Dict[str, int]] = {
+            INTERACTIVE: {"granted": 0, "denied": 0},
+            BACKGROUND: {"granted": 0, "denied": 0},
+        }
+        self.rate_limited = 0
+
+    def try_acquire(self, lane: Optional[str] = None) -> bool:
+        """Take one request from the lane's budget, or return False"""
+        lane = lane or current_lane()
+        granted = (
+            time.monotonic() >= self.backoff_until
+            and (lane == INTERACTIVE or self.bucket.tokens - 1 >= self.background_reserve * self.bucket.capacity)
+            and self.bucket.try_acquire()
+        )
+        self.stats.setdefault(lane, {"granted": 0, "denied": 0})["granted" if granted else "denied"] += 1
+        meter = _current_meter.get()
+        if meter is not None:
+            if granted:
+                meter.granted += 1
+            else:
+                meter.denied += 1
+        return bool(granted)
+
+    def record_rate_limited(self, retry_after: Optional[float] = None):
+        """Back off all lanes after NewsAPI reports we're over quota"""
+        self.rate_limited += 1
+        self._backoff = min(BACKOFF_MAX, self._backoff * 2 if self._backoff else BACKOFF_BASE)
+        delay = max(retry_after or 0.0, self._backoff)
+        self.backoff_until = time.monotonic() + delay
+        logger.warning(f"NewsAPI rate limited, pausing upstream calls for {delay:.0f}s")
+
+    def record_success(self):
+        self._backoff = 0.0
+
+    def state(self) -> Dict:
+        return {
+            "daily_quota": self.daily_quota,
+            "tokens": round(self.bucket.tokens, 2),
+            "capacity": self.bucket.capacity,
+            "backoff_remaining_s": round(max(0.0, self.backoff_until - time.monotonic()), 1),
+            "rate_limited": self.rate_limited,
+            "lanes": {lane: dict(counts) for lane, counts in self.stats.items()},
+        }
+
+quota_manager = QuotaManager()
@@ -0,0 +1,133 @@
+import heapq
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from articles import Article
+
+SEARCH_INDEX_MAX_DOCS = int(os.getenv("SEARCH_INDEX_MAX_DOCS", "20000"))
+SEARCH_INDEX_MAX_AGE = float(os.getenv("SEARCH_INDEX_MAX_AGE_MINUTES", "60")) * 60
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the to was were will with".split()
+)
+
+def tokenize(text: str) -> List[str]:
+    """Casefolded word tokens in any script, with stopwords removed"""
+    return [t for t in _TOKEN_RE.findall(text.casefold()) if t not in _STOPWORDS]
+
+class _Doc:
+    __slots__ = ("article", "terms", "length", "ingested_at")
+
+    def __init__(self, article: Article, terms: Dict[str, int], ingested_at: float):
+        self.article = article
+        self.terms = terms
+        self.length = sum(terms.values())
+        self.ingested_at = ingested_at
+
+class ArticleIndex:
+    """In-memory inverted index over article titles and descriptions, ranked with BM25.
+
+    Articles are keyed by URL; re-adding one replaces it and refreshes its
+    ingest time. The index holds at most `max_docs` articles and drops the
+    least recently ingested first, so memory stays bounded.
+    """
+
+    def __init__(self, max_docs: int = SEARCH_INDEX_MAX_DOCS, k1: float = 1.2, b: float = 0.75):
+        self.max_docs = max_docs
+        self.k1 = k1
+        self.b = b
+        self._docs: "OrderedDict[str, _Doc]" = OrderedDict()
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, article: Article, ingested_at: Optional[float] = None):
+        url = article.url
+        if url in self._docs:
+            self.remove(url)
+        text = f"{article.title or ''} {article.description or ''}"
+        terms: Dict[str, int] = {}
+        for token in tokenize(text):
+            terms[token] = terms.get(token, 0) + 1
+        doc = _Doc(article, terms, time.time() if ingested_at is None else ingested_at)
+        self._docs[url] = doc
+        self._total_length += doc.length
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[url] = tf
+        while len(self._docs) > self.max_docs:
+            self.remove(next(iter(self._docs)))
+
+    def add_many(self, articles: Iterable[Article], ingested_at: Optional[float] = None):
+        for article in articles:
+            self.add(article, ingested_at)
+
+    def remove(self, url: str):
+        doc = self._docs.pop(url, None)
+        if doc is None:
+            return
+        self._total_length -= doc.length
+        for term in doc.terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(url, None)
+                if not postings:
+                    del self._postings[term]
+
+    def prune(self, max_age: float = SEARCH_INDEX_MAX_AGE) -> int:
+        """Drop articles ingested more than `max_age` seconds ago"""
+        cutoff = time.time() - max_age
+        removed = 0
+        while self._docs:
+            url, doc = next(iter(self._docs.items()))
+            if doc.ingested_at >= cutoff:
+                break
+            self.remove(url)
+            removed += 1
+        return removed
+
+    def search(self, query: str, limit: int = 5, max_age: float = SEARCH_INDEX_MAX_AGE) -> List[Article]:
+        """Best matches containing every query term, ingested within `max_age` seconds"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self._docs:
+            return []
+        postings = [self._postings.get(term) for term in terms]
+        if not all(postings):
+            return []
+        postings.sort(key=len)
+        rest = postings[1:]
+        candidates = [url for url in postings[0] if all(url in p for p in rest)] if rest else list(postings[0])
+        if not candidates:
+            return []
+
+        docs = self._docs
+        n = len(docs)
+        weights = [(math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)), p) for p in postings]
+        # BM25 length normalisation, k1 * (1 - b + b * len / avg_len), split into two constants.
+        # The (k1 + 1) numerator factor is the same for every document, so it is dropped.
+        norm_base = self.k1 * (1 - self.b)
+        norm_per_token = self.k1 * self.b * n / self._total_length if self._total_length else 0.0
+        cutoff = time.time() - max_age
+        scored: List[Tuple[float, str]] = []
+        for url in candidates:
+            doc = docs[url]
+            if doc.ingested_at < cutoff:
+                continue
+            norm = norm_base + norm_per_token * doc.length
+            score = 0.0
+            for weight, p in weights:
+                tf = p[url]
+                score += weight * tf / (tf + norm)
+            scored.append((score, url))
+        return [docs[url].article for _, url in heapq.nlargest(limit, scored)]
+
+    def stats(self) -> Dict[str, int]:
+        return {"documents": len(self._docs), "terms": len(self._postings)}
+
+article_index = ArticleIndex()
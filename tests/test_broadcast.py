@@ -0,0 +1,65 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+import discord
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# database.py exits at import without a URI; nothing here connects to it
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:1/test")
+
+import broadcast  # noqa: E402
+from broadcast import BroadcastPipeline  # noqa: E402
+from ratelimit import TokenBucket  # noqa: E402
+
+class DeletedChannel:
+    async def send(self, **kwargs):
+        raise discord.NotFound(mock.Mock(status=404, reason="Not Found"), "Unknown Channel")
+
+class WorkingChannel:
+    def __init__(self, sent):
+        self.sent = sent
+
+    async def send(self, **kwargs):
+        self.sent.append(kwargs)
+
+class FakeBot:
+    shard_count = 1
+
+    def __init__(self):
+        self.sent = []
+
+    def get_partial_messageable(self, channel_id, guild_id=None):
+        return DeletedChannel() if channel_id == 1 else WorkingChannel(self.sent)
+
+class BroadcastWorkerTest(unittest.TestCase):
+    def test_channel_errors_are_counted_not_raised(self):
+        async def fetch_top_headlines(country, count):
+            return [{"title": "Broadcast", "url": "https://example.com/broadcast"}]
+
+        async def create_news_embed(article, emoji, style):
+            return object()
+
+        async def get_guild_channels_by_shard(shard_count):
+            return {0: [(guild, guild) for guild in range(1, 6)]}
+
+        async def clear_guild_news_channel(guild_id):
+            raise asyncio.TimeoutError()
+
+        bot = FakeBot()
+        with mock.patch.object(broadcast, "fetch_top_headlines", fetch_top_headlines), \
+                mock.patch.object(broadcast, "create_news_embed", create_news_embed), \
+                mock.patch.object(broadcast, "get_guild_channels_by_shard", get_guild_channels_by_shard), \
+                mock.patch.object(broadcast, "clear_guild_news_channel", clear_guild_news_channel):
+            pipeline = BroadcastPipeline(bot, concurrency=1, limiter=TokenBucket(1000))
+            stats = asyncio.run(pipeline.run())
+
+        self.assertEqual(stats["failed"], 1)
+        self.assertEqual(stats["delivered"], 4)
+        self.assertEqual(len(bot.sent), 4)
+        self.assertIn("duration_s", stats)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from articles import Article  # noqa: E402
+from dedup import DuplicateIndex, simhash  # noqa: E402
+
+class DuplicateIndexTest(unittest.TestCase):
+    def test_articles_without_text_are_not_collapsed(self):
+        index = DuplicateIndex()
+        articles = [Article("https://a.example/1", title=None, source="A"),
+                    Article("https://b.example/2", title="", description=None, source="B")]
+        collapsed = index.collapse(articles)
+        self.assertEqual([a.url for a in collapsed], ["https://a.example/1", "https://b.example/2"])
+        self.assertEqual([a.alternate_sources for a in collapsed], [(), ()])
+        self.assertIsNone(simhash(""))
+
+    def test_near_duplicates_are_collapsed(self):
+        index = DuplicateIndex()
+        text = "Central bank raises interest rates by a quarter point to fight inflation"
+        collapsed = index.collapse([
+            Article("https://a.example/rates", title=f"{text} - A", source="A"),
+            Article("https://b.example/rates", title=f"{text} - B", source="B"),
+        ])
+        self.assertEqual(len(collapsed), 1)
+        self.assertEqual(collapsed[0].alternate_sources, (("B", "https://b.example/rates"),))
+
+if __name__ == "__main__":
+    unittest.main()
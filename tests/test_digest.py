@@ -0,0 +1,48 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# database.py exits at import without a URI; nothing here connects to it
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:1/test")
+
+import digest  # noqa: E402
+from digest import DigestEngine  # noqa: E402
+from ratelimit import TokenBucket  # noqa: E402
+
+class DisconnectingBot:
+    """Bot whose DM channel opens always fail with an error discord.py doesn't wrap"""
+
+    def __init__(self):
+        self.attempts = 0
+
+    async def create_dm(self, user):
+        self.attempts += 1
+        raise aiohttp.ServerDisconnectedError()
+
+class DigestWorkerTest(unittest.TestCase):
+    def test_unexpected_send_errors_do_not_hang_the_run(self):
+        async def get_digest_groups():
+            return [("us", ("en",), list(range(25)))]
+
+        async def fetch_top_headlines(country, count):
+            return [{"title": "Digest", "url": "https://example.com/digest"}]
+
+        bot = DisconnectingBot()
+        with mock.patch.object(digest, "get_digest_groups", get_digest_groups), \
+                mock.patch.object(digest, "fetch_top_headlines", fetch_top_headlines), \
+                mock.patch.object(digest, "create_digest_embed", lambda *args: object()):
+            engine = DigestEngine(bot, concurrency=2, limiter=TokenBucket(1000))
+            stats = asyncio.run(asyncio.wait_for(engine.run(), timeout=5))
+
+        self.assertEqual(stats["recipients"], 25)
+        self.assertEqual(stats["failed"], 25)
+        self.assertEqual(stats["delivered"], 0)
+        self.assertEqual(bot.attempts, 25)
+
+if __name__ == "__main__":
+    unittest.main()
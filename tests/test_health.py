@@ -0,0 +1,76 @@
+import asyncio
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+from aiohttp.test_utils import make_mocked_request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# database.py exits at import without a URI; nothing here connects to it
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:1/test")
+
+import health  # noqa: E402
+import news_api  # noqa: E402
+from health import HealthServer  # noqa: E402
+
+def get(server: HealthServer, remote: str, headers=None):
+    request = make_mocked_request("GET", "/debug/traces", headers=headers or {}).clone(remote=remote)
+    return asyncio.run(server.traces(request))
+
+class DebugTracesAccessTest(unittest.TestCase):
+    def setUp(self):
+        self.server = HealthServer(bot=None)
+
+    def test_without_token_only_loopback_is_allowed(self):
+        with mock.patch.object(health, "DEBUG_TOKEN", None):
+            self.assertEqual(get(self.server, "203.0.113.7").status, 403)
+            self.assertEqual(get(self.server, "127.0.0.1").status, 200)
+
+    def test_token_is_required_when_configured(self):
+        with mock.patch.object(health, "DEBUG_TOKEN", "secret"):
+            self.assertEqual(get(self.server, "127.0.0.1").status, 403)
+            self.assertEqual(get(self.server, "203.0.113.7", {"Authorization": "Bearer wrong"}).status, 403)
+            response = get(self.server, "203.0.113.7", {"Authorization": "Bearer secret"})
+            self.assertEqual(response.status, 200)
+            self.assertIn("traces", json.loads(response.body))
+
+class ReadyBot:
+    latency = 0.05
+
+    def is_ready(self):
+        return True
+
+    def is_closed(self):
+        return False
+
+class ReadyEndpointTest(unittest.TestCase):
+    def test_repeated_probes_from_one_address_are_not_rate_limited(self):
+        async def ping():
+            return None
+
+        server = HealthServer(bot=ReadyBot())
+
+        async def probe_twice():
+            statuses = []
+            for _ in range(2):
+                request = make_mocked_request("GET", "/ready").clone(remote="10.0.0.1")
+                statuses.append((await server.ready(request)).status)
+            return statuses
+
+        with mock.patch.object(health.async_database, "ping", ping):
+            self.assertEqual(asyncio.run(probe_twice()), [200, 200])
+
+class TraceKeyTest(unittest.TestCase):
+    def test_search_text_is_hashed(self):
+        key = news_api._trace_key("query_my private search")
+        self.assertTrue(key.startswith("query_"))
+        self.assertNotIn("private", key)
+        self.assertEqual(key, news_api._trace_key("query_my private search"))
+
+    def test_feed_keys_are_kept(self):
+        self.assertEqual(news_api._trace_key("headlines_us_False"), "headlines_us_False")
+
+if __name__ == "__main__":
+    unittest.main()
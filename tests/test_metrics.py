@@ -0,0 +1,34 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import CallbackMetric, Counter, Histogram, Registry, _Metric  # noqa: E402
+
+class MetricTypesTest(unittest.TestCase):
+    def test_metric_without_overrides_fails_at_construction(self):
+        class Incomplete(_Metric):
+            pass
+
+        with self.assertRaises(TypeError):
+            Incomplete("incomplete", "missing overrides", registry=Registry())
+
+    def test_render(self):
+        registry = Registry()
+        Counter("requests", "Requests", ("status",), registry=registry).labels("200").inc()
+        Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0), registry=registry).observe(0.5)
+        CallbackMetric("entries", "Entries", "gauge", lambda: 3, registry=registry)
+        CallbackMetric("lookups", "Lookups", "counter", lambda: 7, registry=registry)
+        rendered = registry.render()
+        self.assertIn("# TYPE requests_total counter", rendered)
+        self.assertIn('requests_total{status="200"} 1', rendered)
+        self.assertIn("# TYPE lookups_total counter\nlookups_total 7", rendered)
+        self.assertIn("# TYPE latency_seconds histogram", rendered)
+        self.assertIn('latency_seconds_bucket{le="0.1"} 0', rendered)
+        self.assertIn('latency_seconds_bucket{le="1"} 1', rendered)
+        self.assertIn("latency_seconds_count 1", rendered)
+        self.assertIn("entries 3", rendered)
+
+if __name__ == "__main__":
+    unittest.main()
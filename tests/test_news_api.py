@@ -0,0 +1,64 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# database.py exits at import without a URI; nothing here connects to it
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:1/test")
+
+import news_api  # noqa: E402
+from quota import BACKGROUND, INTERACTIVE, background_lane  # noqa: E402
+
+PAYLOAD = {"status": "ok", "articles": [
+    {"title": "Lane test", "description": "d", "url": "https://example.com/lane", "source": {"name": "S"}}
+]}
+
+class LanePromotionTest(unittest.TestCase):
+    def setUp(self):
+        news_api.api_cache.clear()
+        for target, value in ((news_api.article_writer, "submit"), (news_api.article_index, "add_many")):
+            patcher = mock.patch.object(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.lanes = []
+
+        async def hedged_request(url, params):
+            return PAYLOAD
+        patcher = mock.patch.object(news_api, "_hedged_request", hedged_request)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def try_acquire(self, lane=None):
+        self.lanes.append(lane)
+        # Background reserve is empty; only interactive budget is left
+        return lane == INTERACTIVE
+
+    async def fetch(self, key):
+        return await news_api._fetch_articles(key, "http://newsapi.invalid/v2/top-headlines", {}, key)
+
+    def test_interactive_caller_promotes_background_fetch(self):
+        async def scenario():
+            with background_lane():
+                news_api._start_fetch("lane_key", "http://newsapi.invalid/v2/top-headlines", {}, "lane_key")
+            return await self.fetch("lane_key")
+
+        with mock.patch.object(news_api.quota_manager, "try_acquire", self.try_acquire):
+            articles = asyncio.run(scenario())
+        self.assertEqual(self.lanes, [INTERACTIVE])
+        self.assertEqual([a.url for a in articles], ["https://example.com/lane"])
+        self.assertNotIn("lane_key", news_api._inflight_lanes)
+
+    def test_background_fetch_alone_stays_background(self):
+        async def scenario():
+            with background_lane():
+                return await self.fetch("background_key")
+
+        with mock.patch.object(news_api.quota_manager, "try_acquire", self.try_acquire):
+            articles = asyncio.run(scenario())
+        self.assertEqual(self.lanes, [BACKGROUND])
+        self.assertEqual(len(articles), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# database.py exits at import without a URI; nothing here connects to it
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:1/test")
+
+import news_api  # noqa: E402
+from quota import QuotaExhausted  # noqa: E402
+from resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError  # noqa: E402
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def open_breaker(clock: FakeClock) -> CircuitBreaker:
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    return breaker
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_single_probe_after_reset_timeout(self):
+        clock = FakeClock()
+        breaker = open_breaker(clock)
+        self.assertFalse(breaker.allow())
+        clock.now += 30
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertTrue(breaker.allow())
+
+    def test_released_probe_lets_the_next_call_through(self):
+        clock = FakeClock()
+        breaker = open_breaker(clock)
+        clock.now += 30
+        self.assertTrue(breaker.allow())
+        breaker.release_probe()
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertTrue(breaker.allow())
+
+class MakeApiRequestProbeTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = open_breaker(self.clock)
+        self.clock.now += 30  # Next call is the half-open probe
+        patcher = mock.patch.object(news_api, "news_api_breaker", self.breaker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_quota_exhausted_probe_is_released(self):
+        with mock.patch.object(news_api.quota_manager, "try_acquire", return_value=False):
+            for _ in range(3):
+                with self.assertRaises(QuotaExhausted):
+                    asyncio.run(news_api.make_api_request("http://newsapi.invalid/v2/top-headlines"))
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+
+    def test_cancelled_probe_is_released(self):
+        async def hang(url, params):
+            await asyncio.sleep(3600)
+
+        async def cancel_probe():
+            task = asyncio.ensure_future(news_api.make_api_request("http://newsapi.invalid/v2/top-headlines"))
+            await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        with mock.patch.object(news_api.quota_manager, "try_acquire", return_value=True), \
+                mock.patch.object(news_api, "_hedged_request", hang):
+            asyncio.run(cancel_probe())
+        self.assertTrue(self.breaker.allow())
+
+    def test_busy_probe_short_circuits_other_calls(self):
+        self.assertTrue(self.breaker.allow())
+        with self.assertRaises(CircuitOpenError):
+            asyncio.run(news_api.make_api_request("http://newsapi.invalid/v2/top-headlines"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from articles import Article  # noqa: E402
+from search_index import ArticleIndex, tokenize  # noqa: E402
+
+def article(url: str, title: str) -> Article:
+    return Article.from_dict({"url": url, "title": title, "description": "", "source": {"name": "S"}})
+
+class TokenizeTest(unittest.TestCase):
+    def test_non_ascii_words_stay_whole(self):
+        self.assertEqual(tokenize("Zürich São Paulo"), ["zürich", "são", "paulo"])
+
+    def test_casefold(self):
+        self.assertEqual(tokenize("Straße STRASSE"), ["strasse", "strasse"])
+
+    def test_stopwords_only_has_no_terms(self):
+        self.assertEqual(tokenize("the of and"), [])
+
+class ArticleIndexTest(unittest.TestCase):
+    def test_non_ascii_query_does_not_match_fragments(self):
+        index = ArticleIndex()
+        index.add(article("https://example.com/rich", "Rich get richer"))
+        index.add(article("https://example.com/zurich", "Zürich wins award"))
+        self.assertEqual([a.url for a in index.search("Zürich", limit=5)], ["https://example.com/zurich"])
+
+if __name__ == "__main__":
+    unittest.main()
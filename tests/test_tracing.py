@@ -0,0 +1,45 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tracing import detached, finish_trace, span, start_trace  # noqa: E402
+
+class SpanTest(unittest.TestCase):
+    def test_stages_nest_under_the_root(self):
+        async def interaction():
+            root = start_trace("/news")
+            with span("fetch"):
+                with span("upstream"):
+                    pass
+            finish_trace(root, status="ok")
+            return root
+
+        root = asyncio.run(interaction())
+        self.assertEqual([child.name for child in root.children], ["fetch"])
+        self.assertEqual([child.name for child in root.children[0].children], ["upstream"])
+
+    def test_late_task_does_not_change_a_recorded_trace(self):
+        async def interaction():
+            root = start_trace("/news")
+            with span("fetch"):
+                async def refresh():
+                    await asyncio.sleep(0.01)
+                    with span("upstream"):
+                        pass
+                attached = asyncio.ensure_future(refresh())
+                with detached():
+                    detached_task = asyncio.ensure_future(refresh())
+            finish_trace(root, status="ok")
+            duration = root.duration_ms
+            await asyncio.gather(attached, detached_task)
+            return root, duration
+
+        root, duration = asyncio.run(interaction())
+        self.assertEqual(root.children[0].children, [])
+        self.assertEqual(root.duration_ms, duration)
+
+if __name__ == "__main__":
+    unittest.main()
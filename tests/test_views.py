@@ -0,0 +1,70 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# database.py exits at import without a URI; nothing here connects to it
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:1/test")
+
+import views  # noqa: E402
+from articles import Article, ArticleFeed  # noqa: E402
+from metrics import paginators_active  # noqa: E402
+from views import NewsPaginator, embed_cache, render_article_embed  # noqa: E402
+
+def active() -> float:
+    return paginators_active.labels().value
+
+class PaginatorGaugeTest(unittest.TestCase):
+    def setUp(self):
+        paginators_active.set(0)
+
+    def test_unsent_view_is_not_counted(self):
+        async def build():
+            NewsPaginator(ArticleFeed(), 1)
+        asyncio.run(build())
+        self.assertEqual(active(), 0)
+
+    def test_sent_view_is_counted_until_stopped(self):
+        async def scenario():
+            view = NewsPaginator(ArticleFeed(), 1)
+            view.mark_sent()
+            view.mark_sent()
+            self.assertEqual(active(), 1)
+            view.stop()
+            view.stop()
+        asyncio.run(scenario())
+        self.assertEqual(active(), 0)
+
+    def test_timeout_uncounts_once(self):
+        async def scenario():
+            view = NewsPaginator(ArticleFeed(), 1)
+            view.mark_sent()
+            await view.on_timeout()
+            view.stop()
+        asyncio.run(scenario())
+        self.assertEqual(active(), 0)
+
+class EmbedCacheTest(unittest.TestCase):
+    def setUp(self):
+        embed_cache.clear()
+        self.addCleanup(embed_cache.clear)
+
+    def test_failed_render_is_not_cached(self):
+        article = Article("https://example.com/embed", title="Embed")
+
+        async def broken(*args, **kwargs):
+            raise ValueError("bad article")
+
+        with mock.patch.object(views, "render_news_embed", broken):
+            failed = asyncio.run(render_article_embed(article, "1/1", "default", "Page 1/1"))
+        self.assertEqual(failed.title, "Error")
+        self.assertEqual(len(embed_cache), 0)
+
+        embed = asyncio.run(render_article_embed(article, "1/1", "default", "Page 1/1"))
+        self.assertIn("Embed", embed.title)
+        self.assertIs(asyncio.run(render_article_embed(article, "1/1", "default", "Page 1/1")), embed)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# database.py exits at import without a URI; nothing here connects to it
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:1/test")
+
+import news_api  # noqa: E402
+import warmer  # noqa: E402
+from articles import ArticleFeed  # noqa: E402
+from quota import QuotaManager  # noqa: E402
+from warmer import CacheWarmer  # noqa: E402
+
+PAYLOAD = {"status": "ok", "articles": [
+    {"title": "Warm", "description": "d", "url": "https://example.com/warm", "source": {"name": "S"}}
+]}
+
+class WarmerBudgetTest(unittest.TestCase):
+    def setUp(self):
+        news_api.api_cache.clear()
+        self.addCleanup(news_api.api_cache.clear)
+        self.sent = 0
+
+        async def get_country_popularity():
+            return {"us": 10, "gb": 5, "de": 1}
+
+        async def hedged_request(url, params):
+            self.sent += 1
+            return PAYLOAD
+
+        for target, name, value in (
+            (warmer, "get_country_popularity", get_country_popularity),
+            (news_api, "_hedged_request", hedged_request),
+            (news_api, "NEWS_API_KEY", "test"),
+            (news_api.article_writer, "submit", mock.Mock()),
+            (news_api.article_index, "add_many", mock.Mock()),
+        ):
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def use_quota(self, quota: QuotaManager):
+        patcher = mock.patch.object(news_api, "quota_manager", quota)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_stale_fallback_is_not_counted_as_warmed(self):
+        # Background reserve covers the whole bucket, so every background call is denied
+        self.use_quota(QuotaManager(daily_quota=100, burst=10, background_reserve=1.0))
+        news_api.api_cache.set(news_api.headlines_cache_key("us"), ArticleFeed(), ttl=0, stale_ttl=600)
+
+        stats = asyncio.run(CacheWarmer(budget=5).run_cycle())
+
+        self.assertEqual(stats["warmed"], 0)
+        self.assertEqual(stats["requests"], 0)
+        self.assertTrue(stats["out_of_quota"])
+        self.assertEqual(self.sent, 0)
+
+    def test_budget_is_charged_per_request(self):
+        self.use_quota(QuotaManager(daily_quota=100, burst=100, background_reserve=0.0))
+
+        stats = asyncio.run(CacheWarmer(budget=2).run_cycle())
+
+        self.assertEqual(stats["warmed"], 2)
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["skipped"], 1)
+        self.assertEqual(self.sent, 2)
+
+    def test_retries_count_against_the_budget(self):
+        self.use_quota(QuotaManager(daily_quota=100, burst=100, background_reserve=0.0))
+        failures = iter([True])
+
+        async def flaky_request(url, params):
+            self.sent += 1
+            if next(failures, False):
+                raise news_api._TransientError("HTTP 503")
+            return PAYLOAD
+
+        with mock.patch.object(news_api, "_hedged_request", flaky_request), \
+                mock.patch.object(news_api, "RETRY_BASE_DELAY", 0):
+            stats = asyncio.run(CacheWarmer(budget=2).run_cycle())
+
+        self.assertEqual(stats["warmed"], 1)
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(self.sent, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+# Formats seen in article feeds; naive times are taken as UTC
+DATE_FORMATS = (
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%Y-%m-%dT%H:%M:%S.%fZ",
+    "%a, %d %b %Y %H:%M:%S %z",
+    "%Y-%m-%d %H:%M:%S",
+    "%d %b %Y %H:%M:%S",
+    "%B %d, %Y %H:%M:%S",
+)
+_MONTHS = ("January", "February", "March", "April", "May", "June", "July",
+           "August", "September", "October", "November", "December")
+MAX_SOURCE_FORMATS = 1024
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Which DATE_FORMATS entry last matched for each source, tried first next time
+_source_formats: Dict[Optional[str], str] = {}
+
+def _parse_iso(value: str) -> Optional[int]:
+    """Fast path for ISO-8601 times like NewsAPI's 2024-01-31T09:15:00Z"""
+    if len(value) < 19 or value[4] != "-" or value[10] not in "T ":
+        return None
+    if value[-1] == "Z":
+        value = value[:-1] + "+00:00"
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+def _strptime(value: str, fmt: str) -> Optional[int]:
+    try:
+        parsed = datetime.strptime(value, fmt)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return (parsed - _EPOCH) // timedelta(seconds=1)
+
+def parse_timestamp(value: Optional[str], source: Optional[str] = None) -> Optional[int]:
+    """Parse a publish time into epoch seconds, or None if no known format matches.
+
+    ISO-8601 strings go straight to datetime.fromisoformat. Anything else is tried
+    against the format that last worked for `source` before the full list.
+    """
+    # Every known format has a time of day, so skip strings like "yesterday" outright
+    if not value or ":" not in value:
+        return None
+    timestamp = _parse_iso(value)
+    if timestamp is not None:
+        return timestamp
+    known = _source_formats.get(source)
+    if known is not None:
+        timestamp = _strptime(value, known)
+        if timestamp is not None:
+            return timestamp
+    for fmt in DATE_FORMATS:
+        if fmt == known:
+            continue
+        timestamp = _strptime(value, fmt)
+        if timestamp is not None:
+            if source in _source_formats or len(_source_formats) < MAX_SOURCE_FORMATS:
+                _source_formats[source] = fmt
+            return timestamp
+    return None
+
+def format_timestamp(timestamp: int) -> str:
+    """Display form of an epoch timestamp in UTC, e.g. "January 31, 2024 at 09:15 AM"
+
+    Same output as strftime("%B %d, %Y at %I:%M %p") in the C locale, without its overhead.
+    """
+    t = time.gmtime(timestamp)
+    return (f"{_MONTHS[t.tm_mon - 1]} {t.tm_mday:02d}, {t.tm_year} at "
+            f"{t.tm_hour % 12 or 12:02d}:{t.tm_min:02d} {'PM' if t.tm_hour >= 12 else 'AM'}")
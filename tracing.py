@@ -0,0 +1,140 @@
+import contextvars
+import logging
+import os
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "500"))  # Recent traces kept in memory
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))  # Share of traces logged
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "2000"))  # Always log traces slower than this
+
+class Span:
+    """One timed stage of an interaction, with child spans and attributes"""
+    __slots__ = ("name", "start", "end", "attrs", "children")
+
+    def __init__(self, name: str, attrs: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.attrs = attrs or {}
+        self.children: List["Span"] = []
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def to_dict(self, origin: Optional[float] = None) -> Dict:
+        origin = self.start if origin is None else origin
+        data = {
+            "name": self.name,
+            "offset_ms": round((self.start - origin) * 1000, 2),
+            "duration_ms": round(self.duration_ms, 2),
+        }
+        if self.attrs:
+            data["attrs"] = dict(self.attrs)
+        if self.children:
+            data["children"] = [child.to_dict(origin) for child in list(self.children)]
+        return data
+
+    def format(self, depth: int = 0) -> List[str]:
+        attrs = " ".join(f"{key}={value}" for key, value in self.attrs.items())
+        lines = [f"{'  ' * depth}{self.name} {self.duration_ms:.1f}ms {attrs}".rstrip()]
+        for child in list(self.children):
+            lines.extend(child.format(depth + 1))
+        return lines
+
+# Innermost open span of the current task; tasks started inside a span inherit it
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("trace_span", default=None)
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Optional[Span]]:
+    """Time a block as a child of the current span.
+
+    Does nothing outside a trace, or once the current span has ended, so work
+    that outlives its caller can't change a trace that was already recorded.
+    """
+    parent = _current_span.get()
+    if parent is None or parent.end is not None:
+        yield None
+        return
+    child = Span(name, attrs)
+    parent.children.append(child)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        child.end = time.perf_counter()
+        _current_span.reset(token)
+
+def annotate(**attrs):
+    """Attach attributes (cache hits, status codes...) to the current span"""
+    current = _current_span.get()
+    if current is not None and current.end is None:
+        current.attrs.update(attrs)
+
+@contextmanager
+def detached() -> Iterator[None]:
+    """Run a block outside any trace, e.g. to start a task that outlives the caller"""
+    token = _current_span.set(None)
+    try:
+        yield
+    finally:
+        _current_span.reset(token)
+
+def start_trace(name: str, **attrs) -> Span:
+    """Open a root span and make it current for the rest of this task"""
+    root = Span(name, attrs)
+    _current_span.set(root)
+    return root
+
+def finish_trace(root: Span, **attrs):
+    root.end = time.perf_counter()
+    root.attrs.update(attrs)
+    trace_collector.record(root)
+
+class TraceCollector:
+    """Ring buffer of finished traces plus a sampled log sink.
+
+    Every trace is kept in a bounded deque for the debug endpoint; a
+    `sample_rate` share of them is logged at INFO, and traces slower than
+    `slow_ms` are always logged at WARNING.
+    """
+
+    def __init__(self, size: int = TRACE_BUFFER_SIZE, sample_rate: float = TRACE_SAMPLE_RATE,
+                 slow_ms: float = TRACE_SLOW_MS):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self._traces: Deque[Span] = deque(maxlen=size)
+        self.recorded = 0
+
+    def record(self, root: Span):
+        self._traces.append(root)
+        self.recorded += 1
+        duration = root.duration_ms
+        if duration >= self.slow_ms:
+            logger.warning("Slow interaction trace:\n" + "\n".join(root.format()))
+        elif self.sample_rate > 0 and random.random() < self.sample_rate:
+            logger.info("Interaction trace:\n" + "\n".join(root.format()))
+
+    def recent(self, min_ms: float = 0.0, limit: int = 20, name: Optional[str] = None) -> List[Dict]:
+        """Slowest recent traces taking at least `min_ms`, optionally for one command"""
+        matches = [
+            root for root in list(self._traces)
+            if root.duration_ms >= min_ms and (name is None or root.name == name)
+        ]
+        matches.sort(key=lambda root: root.duration_ms, reverse=True)
+        return [root.to_dict() for root in matches[:limit]]
+
+trace_collector = TraceCollector()
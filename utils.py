@@ -1,44 +1,39 @@
 import discord
-from database import get_all_categories
+import autocomplete
 from discord import Interaction, app_commands
-from database import is_registered
+from async_database import is_registered
 from datetime import datetime
-from typing import Optional, List, Dict, Union
+from typing import Optional, List, Dict, Sequence, Union
+from articles import Article
+from timeparse import format_timestamp, parse_timestamp
+from tracing import span
 import asyncio
 import logging
+import math
 
 def require_registration():
     async def predicate(interaction: Interaction) -> bool:
-        if not is_registered(interaction.user.id):
-            await interaction.response.send_message(
-                "🚫 You need to register first! Use `/start` to begin.",
-                ephemeral=True
-            )
-            return False
-        return True
+        with span("check.registration"):
+            if not await is_registered(interaction.user.id):
+                await interaction.response.send_message(
+                    "🚫 You need to register first! Use `/start` to begin.",
+                    ephemeral=True
+                )
+                return False
+            return True
     return app_commands.check(predicate)
 
 def format_date(date_str: str) -> str:
     """Format date string to a consistent format"""
-    try:
-        # Try different date formats
-        formats = [
-            "%Y-%m-%dT%H:%M:%SZ",
-            "%Y-%m-%dT%H:%M:%S.%fZ",
-            "%a, %d %b %Y %H:%M:%S %z",
-            "%Y-%m-%d %H:%M:%S",
-            "%d %b %Y %H:%M:%S",
-            "%B %d, %Y %H:%M:%S"
-        ]
-        for fmt in formats:
-            try:
-                date = datetime.strptime(date_str, fmt)
-                return date.strftime("%B %d, %Y at %I:%M %p")
-            except ValueError:
-                continue
-        return date_str
-    except:
-        return date_str
+    timestamp = parse_timestamp(date_str)
+    return format_timestamp(timestamp) if timestamp is not None else date_str
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
 
 def truncate_text(text: str, max_length: int = 2048) -> str:
     if len(text) <= max_length:
@@ -53,78 +48,93 @@ def clean_url(url: str) -> Optional[str]:
         url = 'https://' + url
     return url
 
-def extract_metadata(article: Dict) -> Dict:
+def format_published(article: Article) -> str:
+    """Display form of an article's publish time"""
+    if article.published_ts is not None:
+        return format_timestamp(article.published_ts)
+    return article.published_at or ""
+
+def extract_metadata(article: Article) -> Dict:
     metadata = {
-        "title": article.get("title", "No Title"),
-        "url": clean_url(str(article.get("url") or article.get("link") or "")),
-        "description": article.get("description") or article.get("summary", ""),
-        "source": article.get("source", {}).get("name", "Unknown"),
-        "author": article.get("author"),
-        "published": format_date(article.get("publishedAt") or article.get("published", "")),
-        "image": article.get("urlToImage"),
-        "category": article.get("category"),
-        "keywords": article.get("keywords", [])[:5]
+        "title": article.title or "No Title",
+        "url": clean_url(article.url),
+        "description": article.description or "",
+        "source": article.source or "Unknown",
+        "author": article.author,
+        "published": format_published(article),
+        "image": article.image,
+        "alternate_sources": [name for name, _ in article.alternate_sources]
     }
     return metadata
 
-async def create_news_embed(article: Dict, title_prefix: str, style: str = "default") -> discord.Embed:
-    try:
-        metadata = article
-        description = metadata.get('description', '')
-        if asyncio.iscoroutine(description):
-            description = await description
-        description = truncate_text(description)
-        embed = discord.Embed(
-            title=f"{title_prefix} {metadata.get('title', 'No Title')}",
-            description=description,
-            color=discord.Color.blue()
-        )
-        if metadata.get('url'):
-            embed.url = metadata['url']
-        if metadata.get('image'):
+async def render_news_embed(article: Article, title_prefix: str, style: str = "default") -> discord.Embed:
+    """Build the embed for one article; raises if it can't be rendered"""
+    metadata = extract_metadata(article)
+    description = metadata['description']
+    if style == "compact":
+        description = truncate_text(description, 200)
+    embed = discord.Embed(
+        title=truncate_text(f"{title_prefix} {metadata['title']}", 256),
+        description=truncate_text(description),
+        color=discord.Color.blue()
+    )
+    if metadata['url']:
+        embed.url = metadata['url']
+    if metadata['image']:
+        if style == "compact":
+            embed.set_thumbnail(url=metadata['image'])
+        else:
             embed.set_image(url=metadata['image'])
-        if metadata.get('source'):
-            embed.set_footer(text=f"Source: {metadata['source']}")
-        return embed
+    if style == "detailed":
+        if metadata['author']:
+            embed.add_field(name="Author", value=truncate_text(metadata['author'], 1024))
+        if metadata['published']:
+            embed.add_field(name="Published", value=metadata['published'])
+    embed.set_footer(text=f"Source: {metadata['source']}")
+    if metadata['alternate_sources']:
+        names = metadata['alternate_sources'][:5]
+        embed.add_field(name="Also reported by", value=truncate_text(", ".join(names), 1024), inline=False)
+    return embed
+
+def create_news_error_embed() -> discord.Embed:
+    return discord.Embed(
+        title="Error",
+        description="Failed to create news embed",
+        color=discord.Color.red()
+    )
+
+async def create_news_embed(article: Article, title_prefix: str, style: str = "default") -> discord.Embed:
+    try:
+        return await render_news_embed(article, title_prefix, style=style)
     except Exception as e:
         logging.error(f"Error creating news embed: {e}")
-        return discord.Embed(
-            title="Error",
-            description="Failed to create news embed",
-            color=discord.Color.red()
+        return create_news_error_embed()
+
+def create_digest_embed(articles: Sequence[Article], country: str, languages: List[str]) -> discord.Embed:
+    embed = discord.Embed(
+        title="🗞️ Your Daily News Digest",
+        description=f"Today's top stories for **{country.upper()}**",
+        color=discord.Color.blue(),
+        timestamp=datetime.utcnow()
+    )
+    for i, article in enumerate(articles[:10], start=1):
+        metadata = extract_metadata(article)
+        value = truncate_text(metadata["description"] or "No description", 300)
+        if metadata["url"]:
+            value = f"{value}\n[Read more]({metadata['url']})"
+        embed.add_field(
+            name=truncate_text(f"{i}. {metadata['title']}", 256),
+            value=truncate_text(value, 1024),
+            inline=False
         )
+    embed.set_footer(text=f"Languages: {', '.join(languages)} • /dailynews off to unsubscribe")
+    return embed
 
 async def get_country_choices(interaction: discord.Interaction, current: str) -> List[discord.app_commands.Choice]:
-    items = [
-        ("us", "United States"),
-        ("in", "India"),
-        ("gb", "United Kingdom"),
-        ("au", "Australia"),
-        ("ca", "Canada"),
-        ("de", "Germany"),
-        ("fr", "France"),
-        ("jp", "Japan"),
-        ("br", "Brazil"),
-        ("mx", "Mexico"),
-        ("es", "Spain"),
-        ("it", "Italy"),
-        ("ru", "Russia"),
-        ("cn", "China"),
-        ("kr", "South Korea")
-    ]
-    return [
-        discord.app_commands.Choice(name=f"{name} ({code})", value=code)
-        for code, name in items
-        if current.lower() in name.lower() or current.lower() in code.lower()
-    ]
+    return autocomplete.country_index.search(current)
 
 async def get_category_choices(interaction: discord.Interaction, current: str) -> List[discord.app_commands.Choice]:
-    categories = get_all_categories()
-    return [
-        discord.app_commands.Choice(name=f"{cat.capitalize()} - {desc[:50]}...", value=cat)
-        for cat, desc in categories.items()
-        if current.lower() in cat.lower() or current.lower() in desc.lower()
-    ]
+    return autocomplete.category_index.search(current)
 
 def create_error_embed(title: str, description: str) -> discord.Embed:
     return discord.Embed(
@@ -1,16 +1,54 @@
+import logging
+import os
+
 import discord
 from discord.ui import View, Button, Select
 
+from articles import SORT_ORDERS
+from cache import TTLCache
+from metrics import paginators_active
 from utils import (
     create_error_embed, create_success_embed, create_info_embed,
     create_progress_embed,
-    create_confirmation_embed, create_news_embed
+    create_confirmation_embed, create_news_error_embed, render_news_embed
 )
 
+logger = logging.getLogger(__name__)
+
+EMBED_CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "4096"))
+EMBED_CACHE_TTL = 15 * 60  # Matches the API cache, after which articles are refetched anyway
+
+# Rendered paginator pages shared by every NewsPaginator, keyed by
+# (article, style, position label). Articles are immutable, so a key never goes stale.
+embed_cache = TTLCache(max_entries=EMBED_CACHE_MAX_ENTRIES, default_ttl=EMBED_CACHE_TTL)
+
+async def render_article_embed(article, label: str, style: str, footer: str) -> discord.Embed:
+    """Get the embed for one paginator page, rendering it only on a cache miss.
+
+    The returned embed is shared between paginators and must not be modified.
+    A page that fails to render gets an error embed, which is not cached.
+    """
+    key = (article, style, label)
+    embed = embed_cache.get(key)
+    if embed is None:
+        try:
+            embed = await render_news_embed(article, label, style=style)
+        except Exception as e:
+            logger.error(f"Error creating news embed: {e}")
+            embed = create_news_error_embed()
+            embed.set_footer(text=footer)
+            return embed
+        embed.set_footer(text=footer)
+        embed_cache.set(key, embed)
+    return embed
+
 class NewsPaginator(View):
     def __init__(self, articles, user_id):
         super().__init__(timeout=300)  # 5 minutes timeout
+        self._counted = False  # In paginators_active; only once the view has been sent
+        # A view over the shared feed: articles are shown in self.order, never reordered in place
         self.articles = articles
+        self.order = range(len(articles))
         self.user_id = user_id
         self.index = 0
         self.style = "default"
@@ -64,16 +102,38 @@ class NewsPaginator(View):
         self.add_item(self.style_select)
         self.add_item(self.sort_select)
 
+    def mark_sent(self):
+        """Count this view as active; call once its message was sent to Discord"""
+        if not self._counted and not self.is_finished():
+            self._counted = True
+            paginators_active.inc()
+
+    def _uncount(self):
+        if self._counted:
+            self._counted = False
+            paginators_active.dec()
+
+    def stop(self):
+        self._uncount()
+        super().stop()
+
+    async def on_timeout(self):
+        self._uncount()
+
     async def update_message(self, interaction):
         embed = await self.get_embed()
-        embed.set_footer(text=f"Article {self.index + 1} of {len(self.articles)}")
         await interaction.response.edit_message(embed=embed, view=self)
 
     async def get_embed(self):
         if not self.articles:
             return discord.Embed(title="No Articles", description="No articles to display.")
-        art = self.articles[self.index]
-        return await create_news_embed(art, f"Article {self.index + 1}/{len(self.articles)}", style=self.style)
+        art = self.articles[self.order[self.index]]
+        return await render_article_embed(
+            art,
+            f"Article {self.index + 1}/{len(self.articles)}",
+            self.style,
+            f"Article {self.index + 1} of {len(self.articles)}"
+        )
 
     async def first_article(self, interaction: discord.Interaction):
         if interaction.user.id != self.user_id:
@@ -130,12 +190,9 @@ class NewsPaginator(View):
 
         if hasattr(interaction, 'data') and isinstance(interaction.data, dict) and "values" in interaction.data:
             sort_by = interaction.data["values"][0]
-            if sort_by == "date":
-                self.articles.sort(key=lambda x: x.get("publishedAt") or x.get("published", ""), reverse=True)
-            elif sort_by == "title":
-                self.articles.sort(key=lambda x: x.get("title", "").lower())
-            elif sort_by == "source":
-                self.articles.sort(key=lambda x: x.get("source", {}).get("name", "").lower())
+            if sort_by in SORT_ORDERS:
+                # Computed once per feed and shared by every paginator showing it
+                self.order = self.articles.sort_order(sort_by)
 
             self.sort_by = sort_by
             self.index = 0  # Reset to first article
@@ -0,0 +1,111 @@
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from async_database import get_country_popularity
+from quota import background_lane, metered
+from news_api import (
+    api_cache, feed_demand, fetch_top_headlines, fetch_news_by_category,
+    headlines_cache_key, category_cache_key
+)
+
+logger = logging.getLogger(__name__)
+
+WARM_INTERVAL_MINUTES = int(os.getenv("CACHE_WARM_INTERVAL_MINUTES", "10"))
+WARM_REQUEST_BUDGET = int(os.getenv("CACHE_WARM_REQUEST_BUDGET", "20"))  # NewsAPI calls per cycle
+DEMAND_WEIGHT = 5  # One recent command counts as much as this many users preferring a country
+
+Feed = Tuple[str, Optional[str]]  # (country, category); category None means top headlines
+
+class CacheWarmer:
+    """Pre-fetches the feeds users actually read before their cache entries expire.
+
+    Each cycle ranks (country, category) feeds by the number of users who
+    prefer that country plus recent command demand, then refreshes the most
+    popular ones that would otherwise go stale before the next cycle. Every
+    NewsAPI request counts against `budget`, retries and hedges included; no
+    new feed is started once it is spent, or once the background lane is out
+    of quota. A feed only counts as warmed if its cache entry was renewed, not
+    when the fetch fell back to the stale copy.
+    """
+
+    def __init__(self, budget: int = WARM_REQUEST_BUDGET, interval_minutes: int = WARM_INTERVAL_MINUTES):
+        self.budget = budget
+        self.interval = interval_minutes * 60
+        self.last_cycle: Dict = {}
+
+    async def rank_feeds(self) -> List[Tuple[Feed, float]]:
+        """Score every feed in use, most popular first"""
+        scores: Dict[Feed, float] = {}
+        try:
+            for country, users in (await get_country_popularity()).items():
+                scores[(country, None)] = float(users)
+        except Exception as e:
+            logger.error(f"Error loading country preferences for warmer: {e}")
+        for (country, category), hits in feed_demand.items():
+            feed = (country or "", category)
+            scores[feed] = scores.get(feed, 0.0) + hits * DEMAND_WEIGHT
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+    @staticmethod
+    def _ttl_remaining(feed: Feed) -> Optional[float]:
+        country, category = feed
+        key = category_cache_key(category, country or None) if category else headlines_cache_key(country)
+        return api_cache.ttl_remaining(key)
+
+    def _needs_refresh(self, feed: Feed) -> bool:
+        remaining = self._ttl_remaining(feed)
+        # Refresh anything that would go stale before the next cycle runs
+        return remaining is None or remaining < self.interval + 60
+
+    async def run_cycle(self) -> Dict:
+        """Warm the most popular feeds within the request budget"""
+        start = time.perf_counter()
+        ranked = await self.rank_feeds()
+        warmed, fresh, failed, requests = 0, 0, 0, 0
+        out_of_quota = False
+        for feed, _score in ranked:
+            if requests >= self.budget:
+                break
+            if not self._needs_refresh(feed):
+                fresh += 1
+                continue
+            before = self._ttl_remaining(feed)
+            country, category = feed
+            with background_lane(), metered() as meter:
+                if category:
+                    await fetch_news_by_category(category, country=country or None, refresh=True)
+                else:
+                    await fetch_top_headlines(country=country, refresh=True)
+            requests += meter.granted
+            after = self._ttl_remaining(feed)
+            if after is not None and (before is None or after > before):
+                warmed += 1
+            elif not meter.granted and meter.denied:
+                # Served from the stale copy; later feeds would be turned away too
+                out_of_quota = True
+                break
+            else:
+                failed += 1
+
+        # Halve recent demand so popularity tracks the last few cycles
+        for feed in list(feed_demand):
+            feed_demand[feed] //= 2
+            if not feed_demand[feed]:
+                del feed_demand[feed]
+
+        self.last_cycle = {
+            "feeds": len(ranked),
+            "warmed": warmed,
+            "failed": failed,
+            "already_fresh": fresh,
+            "requests": requests,
+            "out_of_quota": out_of_quota,
+            "skipped": max(0, len(ranked) - warmed - failed - fresh),
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+        logger.info(f"Cache warm cycle: {self.last_cycle}")
+        return self.last_cycle
+
+cache_warmer = CacheWarmer()